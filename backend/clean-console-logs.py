@@ -7,6 +7,9 @@ while preserving console.error statements.
 import re
 import sys
 
+from cleanup_report import build_report, console, emit, file_report, new_parser, run_rules, unified_diff
+from cleanup_staged import add_staged_arguments, run_staged
+
 def clean_console_logs(content):
     """Remove console.log and console.warn, keep console.error"""
     lines = content.split('\n')
@@ -42,22 +45,49 @@ def clean_console_logs(content):
 
     return '\n'.join(result)
 
+def remove_console_calls(lines):
+    """Rule adapter: run clean_console_logs over a list of lines"""
+    cleaned = clean_console_logs(''.join(lines)).splitlines(keepends=True)
+    return cleaned, len(lines) - len(cleaned)
+
+RULES = [
+    ('console_log_warn', remove_console_calls),
+]
+
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python clean-console-logs.py <file>")
-        sys.exit(1)
+    parser = new_parser('Remove console.log / console.warn statements, keep console.error')
+    add_staged_arguments(parser)
+    parser.add_argument('files', nargs='*', help='TypeScript files to clean (with --staged: limit to these)')
+    args = parser.parse_args()
+
+    if args.staged:
+        entries, diffs = run_staged(args, RULES, ('.ts', '.tsx'), args.files)
+        sys.exit(emit(args, build_report(entries), diffs))
 
-    filename = sys.argv[1]
+    if not args.files:
+        parser.error('no files given')
 
-    with open(filename, 'r', encoding='utf-8') as f:
-        content = f.read()
+    dry_run = args.dry_run or args.check
+    entries = []
+    diffs = []
+
+    for filename in args.files:
+        with open(filename, 'r', encoding='utf-8') as f:
+            original = f.readlines()
+
+        cleaned, stats = run_rules(original, RULES)
+        entries.append(file_report(filename, original, cleaned, stats))
+
+        if dry_run:
+            diffs.append(unified_diff(filename, original, cleaned))
+            continue
 
-    cleaned = clean_console_logs(content)
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.writelines(cleaned)
 
-    with open(filename, 'w', encoding='utf-8') as f:
-        f.write(cleaned)
+        print(f"Cleaned {filename}", file=console(args))
 
-    print(f"Cleaned {filename}")
+    sys.exit(emit(args, build_report(entries), diffs))
 
 if __name__ == '__main__':
     main()
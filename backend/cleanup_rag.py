@@ -1,12 +1,17 @@
 #!/usr/bin/env python3
 """
 RAG Service Cleanup Script - Option B
-Removes ~560 lines of dead code and aggressive comment cleanup
+Removes dead code and aggressive comment cleanup
+Use --dry-run / --report / --check to review a cleanup without writing files
 """
 
+import os
 import re
 import sys
 
+from cleanup_report import build_report, console, emit, file_report, new_parser, run_rules, unified_diff
+from cleanup_staged import add_staged_arguments, run_staged
+
 def remove_dead_code_blocks(lines):
     """Remove confirmed dead code blocks"""
     removed_count = 0
@@ -247,64 +252,68 @@ def clean_blank_lines(lines):
 
     return result_lines, removed_count
 
+RULES = [
+    ('dead_code_blocks', remove_dead_code_blocks),
+    ('section_dividers', remove_section_dividers),
+    ('aggressive_comments', remove_aggressive_comments),
+    ('excess_blank_lines', clean_blank_lines),
+]
+
+DEFAULT_INPUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src', 'services', 'rag.service.ts')
+
 def main():
-    input_file = r'C:\Users\Pedro\Desktop\webapp\backend\src\services\rag.service.ts'
-    output_file = r'C:\Users\Pedro\Desktop\webapp\backend\src\services\rag.service.ts.cleaned'
-
-    print("Reading file...")
-    with open(input_file, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    original_count = len(lines)
-    print(f"Original line count: {original_count}")
-
-    # Step 1: Remove dead code blocks
-    print("\n1. Removing dead code blocks...")
-    lines, dead_removed = remove_dead_code_blocks(lines)
-    print(f"   Removed {dead_removed} lines")
-
-    # Step 2: Remove section dividers
-    print("\n2. Removing section dividers...")
-    lines, dividers_removed = remove_section_dividers(lines)
-    print(f"   Removed {dividers_removed} lines")
-
-    # Step 3: Aggressive comment removal
-    print("\n3. Removing aggressive comments...")
-    lines, comments_removed = remove_aggressive_comments(lines)
-    print(f"   Removed {comments_removed} lines")
-
-    # Step 4: Clean excessive blank lines
-    print("\n4. Cleaning excessive blank lines...")
-    lines, blanks_removed = clean_blank_lines(lines)
-    print(f"   Removed {blanks_removed} lines")
-
-    final_count = len(lines)
-    total_removed = original_count - final_count
-
-    print(f"\n{'='*60}")
-    print(f"SUMMARY:")
-    print(f"  Original lines:  {original_count:,}")
-    print(f"  Final lines:     {final_count:,}")
-    print(f"  Lines removed:   {total_removed:,}")
-    print(f"  Target removal:  ~560")
-    print(f"  Target final:    ~10,210")
-    print(f"{'='*60}")
-
-    # Write cleaned file
-    print(f"\nWriting cleaned file to: {output_file}")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.writelines(lines)
-
-    print("Cleanup complete!")
-
-    # Show breakdown
-    print(f"\nBreakdown:")
-    print(f"  Dead code blocks:    {dead_removed:>4} lines")
-    print(f"  Section dividers:    {dividers_removed:>4} lines")
-    print(f"  Aggressive comments: {comments_removed:>4} lines")
-    print(f"  Excess blank lines:  {blanks_removed:>4} lines")
-    print(f"  {'-'*30}")
-    print(f"  Total removed:       {total_removed:>4} lines")
+    parser = new_parser('RAG service cleanup: dead code, dividers, comments, blank lines')
+    add_staged_arguments(parser)
+    parser.add_argument('files', nargs='*',
+                        help='files to clean (default: src/services/rag.service.ts; with --staged: limit to these)')
+    parser.add_argument('--in-place', action='store_true',
+                        help='overwrite the input instead of writing a .cleaned copy')
+    args = parser.parse_args()
+
+    if args.staged:
+        entries, diffs = run_staged(args, RULES, ('.ts', '.tsx'), args.files)
+        sys.exit(emit(args, build_report(entries), diffs))
+
+    args.files = args.files or [DEFAULT_INPUT]
+
+    dry_run = args.dry_run or args.check
+    out = sys.stderr if dry_run else console(args)
+    entries = []
+    diffs = []
+
+    for input_file in args.files:
+        print(f"Reading {input_file}...", file=out)
+        with open(input_file, 'r', encoding='utf-8') as f:
+            original = f.readlines()
+
+        lines, stats = run_rules(original, RULES)
+        entry = file_report(input_file, original, lines, stats)
+        entries.append(entry)
+
+        if dry_run:
+            diffs.append(unified_diff(input_file, original, lines))
+            continue
+
+        output_file = input_file if args.in_place else input_file + '.cleaned'
+        print(f"Writing cleaned file to: {output_file}", file=out)
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.writelines(lines)
+
+        print(f"\n{'='*60}", file=out)
+        print(f"SUMMARY:", file=out)
+        print(f"  Original lines:  {entry['original_lines']:,}", file=out)
+        print(f"  Final lines:     {entry['final_lines']:,}", file=out)
+        print(f"  Lines removed:   {entry['lines_removed']:,}", file=out)
+        print(f"  Bytes saved:     {entry['bytes_saved']:,}", file=out)
+        print(f"{'='*60}", file=out)
+
+        print(f"\nBreakdown:", file=out)
+        for s in stats:
+            print(f"  {s['rule']:<20} {s['lines_removed']:>5} lines {s['bytes_saved']:>8} bytes {s['time_ms']:>9.1f} ms", file=out)
+        print(f"  {'-'*30}", file=out)
+        print(f"  Total removed:       {entry['lines_removed']:>4} lines", file=out)
+
+    sys.exit(emit(args, build_report(entries), diffs))
 
 if __name__ == '__main__':
     main()
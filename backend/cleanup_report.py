@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the source cleanup scripts
+Runs cleanup rules with per-rule statistics, renders unified diffs
+and writes the machine-readable report used by --dry-run / --check
+"""
+
+import argparse
+import difflib
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+from telemetry import registry
+
+metrics = registry()
+
+
+def count_bytes(lines):
+    """Size of a list of lines in UTF-8 bytes"""
+    return sum(len(line.encode('utf-8')) for line in lines)
+
+
+def run_rules(lines, rules, record_removed=True):
+    """Apply (name, fn) rules in order; each fn returns (lines, removed_count)
+
+    record_removed=False leaves the removed-lines counter to the caller, for
+    callers that only keep part of the rules' deletions (--staged).
+    """
+    stats = []
+
+    for name, rule in rules:
+        bytes_before = count_bytes(lines)
+        start = time.perf_counter()
+        lines, removed = rule(lines)
+        elapsed = time.perf_counter() - start
+        metrics.observe('cleanup_rule_seconds', elapsed, rule=name)
+        if record_removed:
+            metrics.inc('cleanup_lines_removed_total', removed, rule=name)
+
+        stats.append({
+            'rule': name,
+            'lines_removed': removed,
+            'bytes_saved': bytes_before - count_bytes(lines),
+            'time_ms': round(elapsed * 1000, 3)
+        })
+
+    return lines, stats
+
+
+def unified_diff(path, original, cleaned):
+    """Unified diff between the original and cleaned lines of a file"""
+    diff = difflib.unified_diff(original, cleaned, fromfile=f'a/{path}', tofile=f'b/{path}')
+    out = []
+    for line in diff:
+        out.append(line if line.endswith('\n') else line + '\n\\ No newline at end of file\n')
+    return ''.join(out)
+
+
+def file_report(path, original, cleaned, stats):
+    """Per-file report entry"""
+    return {
+        'file': path,
+        'original_lines': len(original),
+        'final_lines': len(cleaned),
+        'lines_removed': len(original) - len(cleaned),
+        'bytes_saved': count_bytes(original) - count_bytes(cleaned),
+        'time_ms': round(sum(s['time_ms'] for s in stats), 3),
+        'rules': stats
+    }
+
+
+def build_report(files):
+    """Combine per-file entries into the final report with totals"""
+    return {
+        'files': files,
+        'totals': {
+            'files': len(files),
+            'files_changed': len([f for f in files if f['lines_removed'] or f['bytes_saved']]),
+            'lines_removed': sum(f['lines_removed'] for f in files),
+            'bytes_saved': sum(f['bytes_saved'] for f in files),
+            'time_ms': round(sum(f['time_ms'] for f in files), 3)
+        }
+    }
+
+
+def add_report_arguments(parser):
+    """Register the dry-run / report / check flags shared by the cleanup scripts"""
+    parser.add_argument('--dry-run', action='store_true',
+                        help='do not write any files, print a unified diff instead')
+    parser.add_argument('--report', metavar='PATH',
+                        help="write a JSON report (per file, per rule) to PATH, '-' for stdout "
+                             "(diffs and progress then go to stderr)")
+    parser.add_argument('--check', action='store_true',
+                        help='exit with status 1 if any file would change (implies --dry-run)')
+    return parser
+
+
+def console(args):
+    """Stream for diffs and progress text: stderr when the JSON report goes to stdout"""
+    return sys.stderr if args.report == '-' else sys.stdout
+
+
+def emit(args, report, diffs):
+    """Print diffs / write the report according to the parsed flags, return exit code"""
+    totals = report['totals']
+    metrics.inc('cleanup_files_total', totals['files'])
+    metrics.inc('cleanup_files_changed_total', totals['files_changed'])
+    metrics.inc('cleanup_bytes_saved_total', totals['bytes_saved'])
+
+    if args.dry_run or args.check:
+        out = console(args)
+        for diff in diffs:
+            if diff:
+                out.write(diff)
+
+    if args.report:
+        payload = json.dumps(report, indent=2, ensure_ascii=False)
+        if args.report == '-':
+            print(payload)
+        else:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                f.write(payload + '\n')
+
+    if args.check and report['totals']['files_changed']:
+        print(f"[CHECK] {report['totals']['files_changed']} file(s) would change "
+              f"({report['totals']['lines_removed']} lines)", file=sys.stderr)
+        return 1
+    return 0
+
+
+def new_parser(description):
+    """Argument parser with the shared cleanup flags already registered"""
+    return add_report_arguments(argparse.ArgumentParser(description=description))
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+"""
+Git-aware incremental cleanup for the source cleanup scripts
+Reads the staged diff, applies cleanup rules only around changed hunks
+and writes the result back to the index (and the working tree when it
+has no unstaged edits), so hook time scales with the commit, not the file
+"""
+
+import difflib
+import os
+import re
+import subprocess
+import sys
+
+from cleanup_report import console, count_bytes, file_report, metrics, run_rules, unified_diff
+
+HUNK_HEADER = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+
+def git(top, *args, data=None):
+    """Run a git command in the repository root and return stdout bytes"""
+    result = subprocess.run(['git', *args], cwd=top, input=data,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+    return result.stdout
+
+
+def repo_root():
+    """Absolute path of the enclosing git work tree"""
+    return subprocess.run(['git', 'rev-parse', '--show-toplevel'], stdout=subprocess.PIPE,
+                          check=True).stdout.decode('utf-8').strip()
+
+
+def staged_files(top, suffixes, paths=None):
+    """Staged (added/copied/modified) files ending in one of suffixes, optionally limited to paths"""
+    out = git(top, 'diff', '--cached', '--name-only', '--diff-filter=ACM', '-z')
+    files = [f for f in out.decode('utf-8').split('\0') if f and f.endswith(tuple(suffixes))]
+    if paths:
+        wanted = {os.path.relpath(os.path.abspath(p), top).replace(os.sep, '/') for p in paths}
+        files = [f for f in files if f in wanted]
+    return files
+
+
+def changed_ranges(top, path):
+    """0-based [start, end) line ranges added or modified in the staged version of path"""
+    out = git(top, 'diff', '--cached', '-U0', '--no-color', '--no-ext-diff', '--', path)
+    ranges = []
+    for line in out.decode('utf-8', errors='replace').splitlines():
+        match = HUNK_HEADER.match(line)
+        if not match:
+            continue
+        start = int(match.group(1))
+        count = int(match.group(2)) if match.group(2) is not None else 1
+        if count:
+            ranges.append((start - 1, start - 1 + count))
+    return ranges
+
+
+def hunk_windows(ranges, total, context):
+    """Changed ranges widened by context lines and merged where they overlap"""
+    windows = []
+    for start, end in ranges:
+        start, end = max(0, start - context), min(total, end + context)
+        if windows and start <= windows[-1][1]:
+            windows[-1] = (windows[-1][0], max(windows[-1][1], end))
+        else:
+            windows.append((start, end))
+    return windows
+
+
+def overlaps(start, end, ranges):
+    """True if [start, end) intersects any of the ranges"""
+    return any(start < r_end and r_start < end for r_start, r_end in ranges)
+
+
+def apply_rules(lines, rules):
+    """Run the rules without recording stats (used to probe statement boundaries)"""
+    for _, rule in rules:
+        lines, _ = rule(lines)
+    return lines
+
+
+def statements(block, rules):
+    """Split a deleted block into the smallest [start, end) pieces the rules remove on their own
+
+    SequenceMatcher merges neighbouring deletions into one opcode, e.g. an
+    untouched console.log directly above a newly staged one; a split point is
+    a statement boundary when both sides are removed entirely in isolation.
+    """
+    pieces = []
+    start = 0
+    while start < len(block):
+        end = start + 1
+        while end < len(block) and (apply_rules(block[start:end], rules)
+                                    or apply_rules(block[end:], rules)):
+            end += 1
+        pieces.append((start, end))
+        start = end
+    return pieces
+
+
+def piece_stats(piece, rules):
+    """{rule: (lines, bytes)} each rule removes from a deleted piece, applied in order"""
+    removed = {}
+    for name, rule in rules:
+        lines_before, bytes_before = len(piece), count_bytes(piece)
+        piece, _ = rule(piece)
+        removed[name] = (lines_before - len(piece), bytes_before - count_bytes(piece))
+    return removed
+
+
+def clean_hunks(lines, ranges, rules, context):
+    """Run rules on each hunk window and keep only deletions that touch changed lines
+
+    A deleted statement (e.g. a multi-line console.log) is kept whole as long
+    as one of its lines was changed; everything else in the window, including
+    an adjacent untouched statement the same rule matched, is left as is.
+    Per-rule lines/bytes count only the deletions that are kept.
+    """
+    result = []
+    stats = {name: {'rule': name, 'lines_removed': 0, 'bytes_saved': 0, 'time_ms': 0} for name, _ in rules}
+    cursor = 0
+
+    for win_start, win_end in hunk_windows(ranges, len(lines), context):
+        result.extend(lines[cursor:win_start])
+        window = lines[win_start:win_end]
+        cleaned, window_stats = run_rules(window, rules, record_removed=False)
+
+        for s in window_stats:
+            stats[s['rule']]['time_ms'] = round(stats[s['rule']]['time_ms'] + s['time_ms'], 3)
+
+        local = [(s - win_start, e - win_start) for s, e in ranges]
+        matcher = difflib.SequenceMatcher(None, window, cleaned, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'delete' and overlaps(i1, i2, local):
+                for start, end in statements(window[i1:i2], rules):
+                    piece = window[i1 + start:i1 + end]
+                    if not overlaps(i1 + start, i1 + end, local):
+                        result.extend(piece)
+                        continue
+                    for name, (removed, saved) in piece_stats(piece, rules).items():
+                        stats[name]['lines_removed'] += removed
+                        stats[name]['bytes_saved'] += saved
+            else:
+                result.extend(window[i1:i2])
+
+        cursor = win_end
+
+    result.extend(lines[cursor:])
+    for s in stats.values():
+        metrics.inc('cleanup_lines_removed_total', s['lines_removed'], rule=s['rule'])
+    return result, list(stats.values())
+
+
+def restage(top, path, original, cleaned):
+    """Write the cleaned content into the index, and the work tree if it matches the index"""
+    data = ''.join(cleaned).encode('utf-8')
+    mode = git(top, 'ls-files', '-s', '--', path).decode('utf-8').split()[0]
+    sha = git(top, 'hash-object', '-w', '--stdin', '--path', path, data=data).decode('utf-8').strip()
+    git(top, 'update-index', '--cacheinfo', f'{mode},{sha},{path}')
+
+    full_path = os.path.join(top, path)
+    with open(full_path, 'r', encoding='utf-8', newline='') as f:
+        work_tree = f.read()
+
+    if work_tree == ''.join(original):
+        with open(full_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(''.join(cleaned))
+    else:
+        print(f"Warning: {path} has unstaged changes; cleaned the index only", file=sys.stderr)
+
+
+def add_staged_arguments(parser):
+    """Register --staged / --context on a cleanup script's parser"""
+    parser.add_argument('--staged', action='store_true',
+                        help='clean only the changed hunks of staged files and re-stage them')
+    parser.add_argument('--context', type=int, default=20, metavar='N',
+                        help='lines of context around each hunk given to the rules (default: 20)')
+    return parser
+
+
+def run_staged(args, rules, suffixes, paths=None):
+    """Clean staged hunks for every matching file; returns (report entries, diffs)"""
+    top = repo_root()
+    dry_run = args.dry_run or args.check
+    entries = []
+    diffs = []
+
+    for path in staged_files(top, suffixes, paths):
+        original = git(top, 'show', f':{path}').decode('utf-8').splitlines(keepends=True)
+        ranges = changed_ranges(top, path)
+        if not ranges:
+            continue
+
+        cleaned, stats = clean_hunks(original, ranges, rules, args.context)
+        entries.append(file_report(path, original, cleaned, stats))
+
+        if dry_run:
+            diffs.append(unified_diff(path, original, cleaned))
+        elif cleaned != original:
+            restage(top, path, original, cleaned)
+            print(f"Cleaned {path} ({len(original) - len(cleaned)} lines, staged hunks only)", file=console(args))
+
+    return entries, diffs
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Cross-file dead export analysis for backend/src
+Indexes exports, imports, re-exports and dynamic import()/require() calls
+across the tree, then reports unused exports and unreferenced modules.
+Files are scanned in parallel and the per-file index is cached on disk
+(keyed by mtime/size and content hash), so re-runs only rescan changed files.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+CACHE_VERSION = 3
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_ROOT = os.path.join(BACKEND_DIR, 'src')
+DEFAULT_CACHE = os.path.join(BACKEND_DIR, '.dead-exports-cache.json')
+
+SOURCE_EXTENSIONS = ('.ts', '.tsx', '.js', '.jsx')
+RESOLVE_SUFFIXES = ['', '.ts', '.tsx', '.js', '.jsx', '.json',
+                    '/index.ts', '/index.tsx', '/index.js']
+EXCLUDED_DIRS = {'node_modules', 'generated', 'dist'}
+
+# Modules that are loaded by path (server entry, CLI scripts, tests) rather than imported
+DEFAULT_ENTRIES = [
+    r'^server\.ts$',
+    r'^app\.ts$',
+    r'^scripts/',
+    r'^tests/',
+    r'(^|/)__tests__/',
+    r'\.(test|spec)\.tsx?$',
+    r'^workers/',
+]
+
+# Characters the comment scanner stops at, and the end of each literal kind
+CODE_TOKEN = re.compile(r'\\.|[\'"`{}]|//|/\*', re.S)
+LITERAL_END = {
+    "'": re.compile(r"\\.|'|\n", re.S),
+    '"': re.compile(r'\\.|"|\n', re.S),
+    '`': re.compile(r'\\.|`|\$\{', re.S),
+}
+
+# An export starts a line or follows another statement on it (`foo(); export const t = 1`)
+STATEMENT_START = r'(?:^|(?<=[;{}]))\s*'
+# `export default function main` exports only 'default' (EXPORT_DEFAULT), not 'main'
+EXPORT_DECL = re.compile(
+    STATEMENT_START + r'export\s+(?:declare\s+)?(?:abstract\s+)?(?:async\s+)?'
+    r'(?:function\s*\*?|class|const|let|var|interface|type|enum|namespace)\s+([A-Za-z_$][\w$]*)', re.M)
+EXPORT_DEFAULT = re.compile(STATEMENT_START + r'export\s+default\b', re.M)
+EXPORT_LIST = re.compile(STATEMENT_START + r'export\s+(?:type\s+)?\{([^}]*)\}\s*(?:from\s*[\'"]([^\'"]+)[\'"])?', re.M)
+EXPORT_STAR = re.compile(STATEMENT_START + r'export\s+\*\s*(?:as\s+([A-Za-z_$][\w$]*)\s*)?from\s*[\'"]([^\'"]+)[\'"]', re.M)
+IMPORT_FROM = re.compile(r'^\s*import\s+(?:type\s+)?([^;]*?)\s*from\s*[\'"]([^\'"]+)[\'"]', re.M | re.S)
+IMPORT_BARE = re.compile(r'^\s*import\s*[\'"]([^\'"]+)[\'"]', re.M)
+IMPORT_EQUALS = re.compile(r'import\s+[A-Za-z_$][\w$]*\s*=\s*require\(\s*[\'"]([^\'"]+)[\'"]\s*\)')
+DYNAMIC_MEMBER = re.compile(r'\(\s*(?:await\s+)?import\(\s*[\'"]([^\'"]+)[\'"]\s*\)\s*\)\s*\.\s*([A-Za-z_$][\w$]*)')
+DYNAMIC_DESTRUCTURE = re.compile(r'\{([^}]*)\}\s*=\s*(?:await\s+)?import\(\s*[\'"]([^\'"]+)[\'"]\s*\)')
+DYNAMIC_ANY = re.compile(r'(?:\bimport|\brequire)\(\s*[\'"]([^\'"]+)[\'"]\s*\)')
+
+
+def strip_comments(text):
+    """Drop // and /* */ comments, skipping over '...', "..." and `...${expr}...` literals
+
+    A small scanner rather than a regex, so '/**' inside a string (glob patterns
+    like '**/' + name + '/**') does not start a comment and swallow real code.
+    """
+    out = []
+    kept = 0            # start of the source not yet copied to out
+    pos = 0
+    templates = []      # open ${ } braces per enclosing template literal
+
+    def skip_literal(pos, quote):
+        """Index just past the literal starting at pos; enters code at a template's ${"""
+        end = LITERAL_END[quote]
+        while True:
+            match = end.search(text, pos)
+            if match is None:
+                return len(text)
+            token = match.group()
+            if token == '${':
+                templates.append(0)
+                return match.end()
+            if token[0] != '\\':
+                return match.end()
+            pos = match.end()
+
+    while True:
+        match = CODE_TOKEN.search(text, pos)
+        if match is None:
+            break
+        token = match.group()
+        pos = match.end()
+        if token in ('"', "'", '`'):
+            pos = skip_literal(pos, token)
+        elif token == '{':
+            if templates:
+                templates[-1] += 1
+        elif token == '}':
+            if templates and templates[-1]:
+                templates[-1] -= 1
+            elif templates:
+                templates.pop()
+                pos = skip_literal(pos, '`')
+        elif token == '//':
+            out.append(text[kept:match.start()])
+            newline = text.find('\n', pos)
+            pos = kept = len(text) if newline == -1 else newline
+        elif token == '/*':
+            out.append(text[kept:match.start()])
+            close = text.find('*/', pos)
+            pos = kept = len(text) if close == -1 else close + 2
+    out.append(text[kept:])
+    return ''.join(out)
+
+
+def split_names(spec):
+    """Parse 'a, b as c, type d' into [(imported, local)] pairs"""
+    names = []
+    for part in spec.split(','):
+        part = re.sub(r'^\s*type\s+', '', part.strip())
+        if not part:
+            continue
+        if ' as ' in part:
+            source, local = [p.strip() for p in part.split(' as ', 1)]
+        else:
+            source = local = part.split(':')[0].strip()
+        names.append((source, local))
+    return names
+
+
+def parse_module(text):
+    """Extract exports, imports and re-exports from one module's source"""
+    code = strip_comments(text)
+    exports = set(EXPORT_DECL.findall(code))
+    imports = []
+    reexports = []
+    stars = []
+
+    if EXPORT_DEFAULT.search(code):
+        exports.add('default')
+
+    for spec, source in EXPORT_LIST.findall(code):
+        for imported, exported in split_names(spec):
+            exports.add(exported)
+            if source:
+                reexports.append([source, imported, exported])
+
+    for alias, source in EXPORT_STAR.findall(code):
+        if alias:
+            exports.add(alias)
+            imports.append([source, '*'])
+        else:
+            stars.append(source)
+
+    for clause, source in IMPORT_FROM.findall(code):
+        named = re.search(r'\{([^}]*)\}', clause)
+        head = clause[:named.start()] if named else clause
+        for part in head.split(','):
+            part = part.strip()
+            if part.startswith('*'):
+                imports.append([source, '*'])
+            elif part:
+                imports.append([source, 'default'])
+        if named:
+            for imported, _ in split_names(named.group(1)):
+                imports.append([source, imported])
+
+    for source in IMPORT_BARE.findall(code):
+        imports.append([source, None])
+
+    for source in IMPORT_EQUALS.findall(code):
+        imports.append([source, '*'])
+
+    precise = set()
+    for source, member in DYNAMIC_MEMBER.findall(code):
+        imports.append([source, member])
+        precise.add(source)
+    for spec, source in DYNAMIC_DESTRUCTURE.findall(code):
+        for imported, _ in split_names(spec.replace(':', ' as ')):
+            imports.append([source, imported])
+        precise.add(source)
+    for source in DYNAMIC_ANY.findall(code):
+        if source not in precise:
+            imports.append([source, '*'])
+
+    local_uses = {name: len(re.findall(r'\b%s\b' % re.escape(name), code)) > 1
+                  for name in exports if name != 'default'}
+
+    return {
+        'exports': sorted(exports),
+        'imports': imports,
+        'reexports': reexports,
+        'stars': stars,
+        'local_uses': local_uses
+    }
+
+
+def scan_file(path):
+    """Worker: hash and parse one file"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    return path, hashlib.sha1(raw).hexdigest(), parse_module(raw.decode('utf-8', errors='replace'))
+
+
+def walk_sources(root):
+    """All source files under root, skipping generated/vendor directories"""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in EXCLUDED_DIRS]
+        for name in filenames:
+            if name.endswith(SOURCE_EXTENSIONS) and not name.endswith('.d.ts'):
+                yield os.path.join(dirpath, name)
+
+
+def load_cache(path):
+    """Load the on-disk index cache, discarding it on version mismatch"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') == CACHE_VERSION:
+            return cache['files']
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def save_cache(path, files):
+    """Persist the index cache atomically"""
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': CACHE_VERSION, 'files': files}, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def build_index(root, cache_path, workers=None):
+    """Index every module under root, rescanning only files whose mtime/size/hash changed"""
+    cached = load_cache(cache_path) if cache_path else {}
+    index = {}
+    pending = []
+    stats = {'files': 0, 'cache_hits': 0, 'rehashed': 0, 'scanned': 0}
+
+    for path in walk_sources(root):
+        rel = os.path.relpath(path, root).replace(os.sep, '/')
+        st = os.stat(path)
+        entry = cached.get(rel)
+        stats['files'] += 1
+
+        if entry and entry['mtime_ns'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            index[rel] = entry
+            stats['cache_hits'] += 1
+            continue
+
+        if entry:
+            with open(path, 'rb') as f:
+                digest = hashlib.sha1(f.read()).hexdigest()
+            if digest == entry['sha1']:
+                index[rel] = dict(entry, mtime_ns=st.st_mtime_ns)
+                stats['rehashed'] += 1
+                continue
+
+        pending.append((rel, path, st))
+
+    if pending:
+        paths = [path for _, path, _ in pending]
+        if len(paths) < 32 or workers == 1:
+            results = list(map(scan_file, paths))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(scan_file, paths, chunksize=16))
+        for (rel, _, st), (_, digest, parsed) in zip(pending, results):
+            index[rel] = dict(parsed, mtime_ns=st.st_mtime_ns, size=st.st_size, sha1=digest)
+            stats['scanned'] += 1
+
+    if cache_path and (stats['scanned'] or stats['rehashed'] or len(cached) != len(index)):
+        save_cache(cache_path, index)
+
+    return index, stats
+
+
+def resolve(index, importer, spec):
+    """Resolve a relative import specifier to an indexed module, or None for packages"""
+    if not spec.startswith('.'):
+        return None
+    base = os.path.normpath(os.path.join(os.path.dirname(importer), spec)).replace(os.sep, '/')
+    if base.endswith('.js'):
+        base = base[:-3]
+    for suffix in RESOLVE_SUFFIXES:
+        if base + suffix in index:
+            return base + suffix
+    return None
+
+
+def analyze(index, entries=DEFAULT_ENTRIES):
+    """Find exports nobody imports and modules nobody references"""
+    entry_patterns = [re.compile(p) for p in entries]
+    used = {module: set() for module in index}
+    referenced = set()
+    work = []
+
+    for module, info in index.items():
+        for spec, name in info['imports']:
+            target = resolve(index, module, spec)
+            if target and target != module:
+                referenced.add(target)
+                if name:
+                    work.append((target, name))
+        for spec, _, _ in info['reexports']:
+            target = resolve(index, module, spec)
+            if target:
+                referenced.add(target)
+        for spec in info['stars']:
+            target = resolve(index, module, spec)
+            if target:
+                referenced.add(target)
+
+    # Propagate uses through barrels: re-exported names and `export *`
+    seen = set()
+    while work:
+        module, name = work.pop()
+        if (module, name) in seen:
+            continue
+        seen.add((module, name))
+        info = index[module]
+
+        if name == '*':
+            used[module].update(info['exports'])
+            for spec, imported, _ in info['reexports']:
+                target = resolve(index, module, spec)
+                if target:
+                    work.append((target, imported))
+            for spec in info['stars']:
+                target = resolve(index, module, spec)
+                if target:
+                    work.append((target, '*'))
+            continue
+
+        used[module].add(name)
+        for spec, imported, exported in info['reexports']:
+            if exported == name:
+                target = resolve(index, module, spec)
+                if target:
+                    work.append((target, imported))
+        if name not in info['exports']:
+            for spec in info['stars']:
+                target = resolve(index, module, spec)
+                if target:
+                    work.append((target, name))
+
+    unused_exports = []
+    unreferenced = []
+    for module in sorted(index):
+        if any(p.search(module) for p in entry_patterns):
+            continue
+        info = index[module]
+        if module not in referenced:
+            unreferenced.append(module)
+            continue
+        for name in info['exports']:
+            if name not in used[module]:
+                unused_exports.append({
+                    'module': module,
+                    'export': name,
+                    'used_in_module': info['local_uses'].get(name, False)
+                })
+
+    return {'unused_exports': unused_exports, 'unreferenced_modules': unreferenced}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report unused exports and unreferenced modules')
+    parser.add_argument('--root', default=DEFAULT_ROOT, help='source tree to scan (default: backend/src)')
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help='index cache file')
+    parser.add_argument('--no-cache', action='store_true', help='ignore and do not write the cache')
+    parser.add_argument('--workers', type=int, default=None, help='parallel scan processes')
+    parser.add_argument('--entry', action='append', default=[], metavar='REGEX',
+                        help='extra entry-point pattern (relative path regex), may be repeated')
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index, stats = build_index(args.root, None if args.no_cache else args.cache, args.workers)
+    indexed = time.perf_counter()
+    report = analyze(index, DEFAULT_ENTRIES + args.entry)
+    stats['index_ms'] = round((indexed - start) * 1000, 1)
+    stats['analyze_ms'] = round((time.perf_counter() - indexed) * 1000, 1)
+
+    if args.json:
+        print(json.dumps(dict(report, stats=stats), indent=2))
+        return
+
+    print("=" * 60)
+    print("Dead Export Analysis")
+    print("=" * 60)
+    print(f"Files: {stats['files']} (scanned {stats['scanned']}, cached {stats['cache_hits'] + stats['rehashed']})")
+    print(f"Index: {stats['index_ms']} ms, analysis: {stats['analyze_ms']} ms")
+
+    print(f"\nUnreferenced modules ({len(report['unreferenced_modules'])}):")
+    for module in report['unreferenced_modules']:
+        print(f"  - {module}")
+
+    print(f"\nUnused exports ({len(report['unused_exports'])}):")
+    for item in report['unused_exports']:
+        note = ' (used in module)' if item['used_in_module'] else ''
+        print(f"  - {item['module']}: {item['export']}{note}")
+
+
+if __name__ == '__main__':
+    main()
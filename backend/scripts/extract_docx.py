@@ -0,0 +1,503 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Extract text from Word (.docx) files
+Streams word/document.xml and emits paragraphs, headings (with outline level),
+tables as grids and footnotes/endnotes in document order, then each distinct
+header/footer once; memory stays bounded because each body element is
+discarded once emitted
+"""
+
+import sys
+import json
+import io
+import os
+import re
+import time
+import zipfile
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+
+# python-pptx already depends on lxml; fall back to the stdlib parser without it
+try:
+    from lxml.etree import iterparse, fromstring
+except ImportError:
+    from xml.etree.ElementTree import iterparse, fromstring
+
+from telemetry import registry
+
+metrics = registry()
+
+# Set UTF-8 encoding for stdout on Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+R = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+DC = '{http://purl.org/dc/elements/1.1/}'
+DCTERMS = '{http://purl.org/dc/terms/}'
+EXTENDED = '{http://schemas.openxmlformats.org/officeDocument/2006/extended-properties}'
+
+BODY, P, TBL, TR, TC, SDT, SDT_CONTENT, SECT_PR = (W + t for t in ('body', 'p', 'tbl', 'tr', 'tc', 'sdt', 'sdtContent', 'sectPr'))
+T, TAB, BR, CR, NO_BREAK_HYPHEN = (W + t for t in ('t', 'tab', 'br', 'cr', 'noBreakHyphen'))
+P_PR, P_STYLE, OUTLINE_LVL, NUM_PR, ILVL = (W + t for t in ('pPr', 'pStyle', 'outlineLvl', 'numPr', 'ilvl'))
+TC_PR, GRID_SPAN, V_MERGE = (W + t for t in ('tcPr', 'gridSpan', 'vMerge'))
+FOOTNOTE_REF, ENDNOTE_REF = W + 'footnoteReference', W + 'endnoteReference'
+HEADER_REF, FOOTER_REF = W + 'headerReference', W + 'footerReference'
+VAL, ID, TYPE = W + 'val', W + 'id', W + 'type'
+HEADING_NAME = re.compile(r'^heading\s*(\d)$', re.IGNORECASE)
+
+
+def content_children(elem):
+    """Child elements, looking through content controls (w:sdt) to their content"""
+    for child in elem:
+        if child.tag == SDT:
+            content = child.find(SDT_CONTENT)
+            if content is not None:
+                yield from content_children(content)
+        else:
+            yield child
+
+
+def paragraph_text(p, notes):
+    """Visible text of a paragraph; footnote/endnote references are appended to `notes`"""
+    parts = []
+    for el in p.iter():
+        tag = el.tag
+        if tag == T:
+            parts.append(el.text or '')
+        elif tag == TAB:
+            parts.append('\t')
+        elif tag == BR or tag == CR:
+            parts.append('\n')
+        elif tag == NO_BREAK_HYPHEN:
+            parts.append('-')
+        elif tag == FOOTNOTE_REF:
+            notes.append(('footnote', el.get(ID)))
+        elif tag == ENDNOTE_REF:
+            notes.append(('endnote', el.get(ID)))
+    return ''.join(parts).strip()
+
+
+def table_grid(tbl, notes):
+    """Rows of cell texts; cells covered by a horizontal or vertical merge are None"""
+    rows = []
+    for tr in content_children(tbl):
+        if tr.tag != TR:
+            continue
+        row = []
+        for tc in content_children(tr):
+            if tc.tag != TC:
+                continue
+            span = 1
+            continued = False
+            props = tc.find(TC_PR)
+            if props is not None:
+                grid_span = props.find(GRID_SPAN)
+                if grid_span is not None:
+                    span = int(grid_span.get(VAL, 1))
+                v_merge = props.find(V_MERGE)
+                continued = v_merge is not None and v_merge.get(VAL, 'continue') == 'continue'
+            if continued:
+                row.append(None)
+            else:
+                row.append('\n'.join(t for t in (paragraph_text(p, notes) for p in tc.iter(P)) if t))
+            row.extend([None] * (span - 1))
+        rows.append(row)
+    return rows
+
+
+def table_text(rows):
+    """Flattened table text, one line per row (same layout as the PPTX extractor)"""
+    lines = []
+    for row in rows:
+        cells = [c for c in row if c]
+        if cells:
+            lines.append(' | '.join(cells))
+    return '\n'.join(lines)
+
+
+class DocxReader:
+    """Parts of a .docx package needed for streaming extraction"""
+    def __init__(self, archive):
+        self.zip = archive
+        self.document = self.main_part()
+        self.rels, self.rel_types = self.relationships(self.document)
+        self.styles = self.load_styles()
+        self.notes = {'footnote': self.load_notes('footnotes', W + 'footnote'),
+                      'endnote': self.load_notes('endnotes', W + 'endnote')}
+        self.section_refs = []
+        self.section = 0
+
+    def read_xml(self, name):
+        try:
+            return fromstring(self.zip.read(name))
+        except KeyError:
+            return None
+
+    def main_part(self):
+        root = self.read_xml('_rels/.rels')
+        if root is not None:
+            for rel in root.iter(PKG_REL + 'Relationship'):
+                if rel.get('Type', '').endswith('/officeDocument'):
+                    return rel.get('Target').lstrip('/')
+        return 'word/document.xml'
+
+    def relationships(self, part):
+        """(rId -> part name, relationship type -> part name) for a part's internal relationships"""
+        folder, name = posixpath.split(part)
+        root = self.read_xml(posixpath.join(folder, '_rels', name + '.rels'))
+        by_id, by_type = {}, {}
+        if root is not None:
+            for rel in root.iter(PKG_REL + 'Relationship'):
+                if rel.get('TargetMode') == 'External':
+                    continue
+                target = posixpath.normpath(posixpath.join(folder, rel.get('Target')))
+                by_id[rel.get('Id')] = target
+                by_type.setdefault(rel.get('Type', '').rsplit('/', 1)[-1], target)
+        return by_id, by_type
+
+    def related(self, rel_type):
+        """Part name of the document's first relationship of this type (e.g. 'styles')"""
+        return self.rel_types.get(rel_type)
+
+    def load_styles(self):
+        """styleId -> (name, outline level or None), resolving basedOn inheritance"""
+        part = self.related('styles')
+        root = self.read_xml(part) if part else None
+        raw = {}
+        if root is not None:
+            for style in root.iter(W + 'style'):
+                name = style.find(W + 'name')
+                based_on = style.find(W + 'basedOn')
+                level = style.find(f'{P_PR}/{OUTLINE_LVL}')
+                raw[style.get(W + 'styleId')] = (
+                    name.get(VAL) if name is not None else None,
+                    based_on.get(VAL) if based_on is not None else None,
+                    int(level.get(VAL)) if level is not None else None)
+
+        styles = {}
+        for style_id in raw:
+            name, level, seen, current = raw[style_id][0], None, set(), style_id
+            while current in raw and current not in seen and level is None:
+                seen.add(current)
+                level = raw[current][2]
+                current = raw[current][1]
+            match = HEADING_NAME.match(name or '')
+            if level is None and match:
+                level = int(match.group(1)) - 1
+            styles[style_id] = (name, level)
+        return styles
+
+    def load_notes(self, rel_type, tag):
+        """id -> text for footnotes or endnotes (separator notes skipped)"""
+        part = self.related(rel_type)
+        root = self.read_xml(part) if part else None
+        notes = {}
+        if root is not None:
+            for note in root.iter(tag):
+                if note.get(TYPE) in ('separator', 'continuationSeparator', 'continuationNotice'):
+                    continue
+                notes[note.get(ID)] = '\n'.join(t for t in (paragraph_text(p, []) for p in note.iter(P)) if t)
+        return notes
+
+    def metadata(self):
+        core = self.read_xml('docProps/core.xml')
+        app = self.read_xml('docProps/app.xml')
+
+        def text(root, tag):
+            el = root.find(tag) if root is not None else None
+            return (el.text or '') if el is not None else ''
+
+        pages = text(app, EXTENDED + 'Pages')
+        return {
+            'title': text(core, DC + 'title'),
+            'author': text(core, DC + 'creator'),
+            'subject': text(core, DC + 'subject'),
+            'created': text(core, DCTERMS + 'created'),
+            'modified': text(core, DCTERMS + 'modified'),
+            'page_count': int(pages) if pages.isdigit() else None,
+            'document_xml_size': self.zip.getinfo(self.document).file_size
+        }
+
+    def paragraph_block(self, p, notes):
+        text = paragraph_text(p, notes)
+        if not text:
+            return None
+        style_name, level = None, None
+        props = p.find(P_PR)
+        list_level = None
+        if props is not None:
+            style = props.find(P_STYLE)
+            if style is not None:
+                style_name, level = self.styles.get(style.get(VAL), (style.get(VAL), None))
+            outline = props.find(OUTLINE_LVL)
+            if outline is not None:
+                level = int(outline.get(VAL))
+            numbering = props.find(NUM_PR)
+            if numbering is not None:
+                ilvl = numbering.find(ILVL)
+                list_level = int(ilvl.get(VAL)) if ilvl is not None else 0
+
+        # Outline level 9 means "body text" in Word
+        if level is not None and level < 9:
+            block = {'type': 'heading', 'level': level + 1, 'text': text}
+        else:
+            block = {'type': 'paragraph', 'text': text}
+        if style_name:
+            block['style'] = style_name
+        if list_level is not None:
+            block['list_level'] = list_level
+        return block
+
+    def part_text(self, part):
+        """Text of a header/footer part (paragraphs and flattened tables)"""
+        root = self.read_xml(part)
+        if root is None:
+            return ''
+        texts = []
+        for child in content_children(root):
+            if child.tag == P:
+                texts.append(paragraph_text(child, []))
+            elif child.tag == TBL:
+                texts.append(table_text(table_grid(child, [])))
+        return '\n'.join(t for t in texts if t)
+
+    def section_parts(self, sect_pr):
+        """Record a section's header/footer parts; they are emitted after the body, not at each section break"""
+        self.section += 1
+        for ref in sect_pr:
+            part = self.rels.get(ref.get(R + 'id'))
+            if ref.tag in (HEADER_REF, FOOTER_REF) and part:
+                self.section_refs.append((ref.tag, ref.get(TYPE, 'default'), self.section, part))
+
+    def header_footer_blocks(self):
+        """One block per distinct header/footer text, listing the sections that use it
+
+        Sections usually repeat the same header, often as separate parts with
+        identical text, so deduplicating by part alone still repeats it.
+        """
+        texts = {}
+        blocks = {}
+        for tag, kind, section, part in self.section_refs:
+            if part not in texts:
+                texts[part] = self.part_text(part)
+            if not texts[part]:
+                continue
+            block = blocks.get((tag, texts[part]))
+            if block is None:
+                blocks[(tag, texts[part])] = {'type': 'header' if tag == HEADER_REF else 'footer', 'section': section,
+                                              'sections': [section], 'kind': kind, 'text': texts[part]}
+            elif section not in block['sections']:
+                block['sections'].append(section)
+        return list(blocks.values())
+
+    def note_blocks(self, notes):
+        for kind, note_id in notes:
+            text = self.notes[kind].get(note_id)
+            if text:
+                yield {'type': kind, 'id': note_id, 'text': text}
+
+    def body_blocks(self, elem):
+        """Blocks for one top-level body element"""
+        notes = []
+        if elem.tag == P:
+            block = self.paragraph_block(elem, notes)
+            if block:
+                yield block
+            yield from self.note_blocks(notes)
+            props = elem.find(P_PR)
+            sect_pr = props.find(SECT_PR) if props is not None else None
+            if sect_pr is not None:
+                self.section_parts(sect_pr)
+        elif elem.tag == TBL:
+            rows = table_grid(elem, notes)
+            if rows:
+                yield {'type': 'table', 'rows': rows, 'row_count': len(rows),
+                       'col_count': max(map(len, rows))}
+            yield from self.note_blocks(notes)
+        elif elem.tag == SDT:
+            content = elem.find(SDT_CONTENT)
+            if content is not None:
+                for child in content_children(content):
+                    yield from self.body_blocks(child)
+        elif elem.tag == SECT_PR:
+            self.section_parts(elem)
+
+    def blocks(self):
+        """Stream body blocks in document order, discarding each body element after use, then headers/footers"""
+        depth = 0
+        body = None
+        index = 0
+        with self.zip.open(self.document) as stream:
+            for event, elem in iterparse(stream, events=('start', 'end')):
+                if event == 'start':
+                    depth += 1
+                    if depth == 2 and elem.tag == BODY:
+                        body = elem
+                    continue
+                if depth == 3 and body is not None:
+                    for block in self.body_blocks(elem):
+                        block['index'] = index
+                        index += 1
+                        yield block
+                    body.remove(elem)
+                depth -= 1
+        for block in self.header_footer_blocks():
+            block['index'] = index
+            index += 1
+            yield block
+
+
+def block_text(block):
+    """Plain-text rendering of a block for full_text"""
+    kind = block['type']
+    if kind == 'table':
+        return table_text(block['rows'])
+    if kind in ('header', 'footer'):
+        return f"{kind.capitalize()}: {block['text']}"
+    if kind in ('footnote', 'endnote'):
+        return f"[{kind} {block['id']}] {block['text']}"
+    return block['text']
+
+
+def extract_docx_blocks(file_path, emit):
+    """Stream blocks to `emit(block)`; returns the summary (metadata, counts)"""
+    counts = {}
+    characters = 0
+    with zipfile.ZipFile(file_path) as archive:
+        reader = DocxReader(archive)
+        metadata = reader.metadata()
+        for block in reader.blocks():
+            counts[block['type']] = counts.get(block['type'], 0) + 1
+            characters += len(block_text(block))
+            emit(block)
+    for kind, count in counts.items():
+        metrics.inc('docx_blocks_total', count, type=kind)
+    metrics.inc('docx_characters_total', characters)
+    return {
+        'metadata': metadata,
+        'total_blocks': sum(counts.values()),
+        'block_counts': counts,
+        'total_characters': characters
+    }
+
+
+def extract_text_from_docx(file_path):
+    """Extract all blocks and the combined text (single-JSON contract of extract_pptx.py)"""
+    try:
+        blocks = []
+        summary = extract_docx_blocks(file_path, blocks.append)
+        full_text = '\n\n'.join(t for t in map(block_text, blocks) if t)
+        metrics.inc('docx_files_total', status='ok')
+        return {
+            'success': True,
+            'metadata': summary['metadata'],
+            'blocks': blocks,
+            'full_text': full_text,
+            'total_blocks': summary['total_blocks'],
+            'block_counts': summary['block_counts'],
+            'total_characters': len(full_text)
+        }
+
+    except FileNotFoundError:
+        metrics.inc('docx_files_total', status='not_found')
+        return {
+            'success': False,
+            'error': f'File not found: {file_path}'
+        }
+    except Exception as e:
+        metrics.inc('docx_files_total', status='error')
+        return {
+            'success': False,
+            'error': f'Error extracting DOCX: {str(e)}'
+        }
+
+
+def stream_docx_ndjson(file_path, out):
+    """One JSON object per line: blocks in document order, then a final summary line with success"""
+    def emit(block):
+        out.write(json.dumps(block, ensure_ascii=False) + '\n')
+
+    try:
+        summary = extract_docx_blocks(file_path, emit)
+        metrics.inc('docx_files_total', status='ok')
+        emit(dict({'type': 'summary', 'success': True}, **summary))
+    except FileNotFoundError:
+        metrics.inc('docx_files_total', status='not_found')
+        emit({'type': 'summary', 'success': False, 'error': f'File not found: {file_path}'})
+    except Exception as e:
+        metrics.inc('docx_files_total', status='error')
+        emit({'type': 'summary', 'success': False, 'error': f'Error extracting DOCX: {str(e)}'})
+
+
+def peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _benchmark_run(job):
+    """Runs in a fresh worker process so peak RSS is per approach"""
+    approach, file_path = job
+    start = time.perf_counter()
+    if approach == 'streaming':
+        count = [0]
+
+        def emit(block):
+            count[0] += 1
+        extract_docx_blocks(file_path, emit)
+        items = count[0]
+    else:
+        from docx import Document
+        document = Document(file_path)
+        items = sum(1 for p in document.paragraphs if p.text.strip())
+        for table in document.tables:
+            items += 1
+            for row in table.rows:
+                [cell.text for cell in row.cells]
+    return time.perf_counter() - start, items, peak_rss_mb()
+
+
+def benchmark(file_path):
+    """Time and peak memory of the streaming extractor vs python-docx (when installed)"""
+    approaches = ['streaming']
+    try:
+        import docx  # noqa: F401
+        approaches.append('python-docx')
+    except ImportError:
+        pass
+
+    with zipfile.ZipFile(file_path) as archive:
+        size_mb = DocxReader(archive).metadata()['document_xml_size'] / 1e6
+    print("=" * 60)
+    print(f"DOCX extraction benchmark: {os.path.basename(file_path)} ({size_mb:.1f} MB document.xml)")
+    print("=" * 60)
+    for approach in approaches:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            elapsed, items, rss = pool.submit(_benchmark_run, (approach, file_path)).result()
+        print(f"  {approach:<12} {elapsed:8.2f}s  {items:8d} items  {items / elapsed:10.0f} items/s  "
+              f"{size_mb / elapsed:6.1f} MB/s  peak RSS {rss:7.1f} MB")
+
+
+if __name__ == '__main__':
+    flags = {a for a in sys.argv[1:] if a.startswith('--')}
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if len(args) != 1 or flags - {'--ndjson', '--benchmark'}:
+        print(json.dumps({
+            'success': False,
+            'error': 'Usage: python extract_docx.py <file_path> [--ndjson | --benchmark]'
+        }))
+        sys.exit(1)
+
+    file_path = args[0]
+    if '--benchmark' in flags:
+        benchmark(file_path)
+    elif '--ndjson' in flags:
+        with metrics.timer('docx_extract_seconds'):
+            stream_docx_ndjson(file_path, sys.stdout)
+    else:
+        with metrics.timer('docx_extract_seconds'):
+            result = extract_text_from_docx(file_path)
+        print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -11,6 +11,12 @@ import io
 from pptx import Presentation
 from pptx.enum.shapes import MSO_SHAPE_TYPE
 
+from pptx_index import build_deck_index
+from pptx_layout import extract_layout
+from telemetry import registry
+
+metrics = registry()
+
 # Set UTF-8 encoding for stdout on Windows
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
@@ -58,11 +64,12 @@ def extract_text_from_slide(slide, slide_number):
         'text_count': len(texts)
     }
 
-def extract_text_from_pptx(file_path):
-    """Extract text from all slides in a PowerPoint file"""
+def extract_text_from_pptx(file_path, layout=False):
+    """Extract text from all slides in a PowerPoint file (plus layout geometry if requested)"""
     try:
         # Load presentation
-        prs = Presentation(file_path)
+        with metrics.timer('pptx_load_seconds'):
+            prs = Presentation(file_path)
 
         # Extract metadata
         metadata = {
@@ -79,7 +86,8 @@ def extract_text_from_pptx(file_path):
         # Extract text from each slide
         slides = []
         for idx, slide in enumerate(prs.slides, start=1):
-            slide_data = extract_text_from_slide(slide, idx)
+            with metrics.timer('pptx_slide_seconds'):
+                slide_data = extract_text_from_slide(slide, idx)
             slides.append(slide_data)
 
         # Combine all text with slide markers
@@ -90,7 +98,11 @@ def extract_text_from_pptx(file_path):
 
         full_text = '\n\n'.join(full_text_parts)
 
-        return {
+        metrics.inc('pptx_files_total', status='ok')
+        metrics.inc('pptx_slides_total', len(slides))
+        metrics.inc('pptx_characters_total', len(full_text))
+
+        result = {
             'success': True,
             'metadata': metadata,
             'slides': slides,
@@ -100,25 +112,53 @@ def extract_text_from_pptx(file_path):
             'total_characters': len(full_text)
         }
 
+        # Titles, outline and term -> slide positions for local navigation lookups;
+        # like the layout it is optional, a deck it cannot index still returns its text
+        try:
+            with metrics.timer('pptx_index_seconds'):
+                result['deck_index'] = build_deck_index(prs, slides)
+        except Exception as e:
+            metrics.inc('pptx_index_errors_total')
+            result['deck_index'] = None
+            result['deck_index_error'] = f'Error building PPTX deck index: {str(e)}'
+
+        # Slide geometry for previews (pictures reference image ids, no files are written)
+        if layout:
+            # Geometry is optional: a deck it cannot handle still returns its text
+            try:
+                with metrics.timer('pptx_layout_seconds'):
+                    result['layout'] = extract_layout(prs)
+            except Exception as e:
+                metrics.inc('pptx_layout_errors_total')
+                result['layout'] = None
+                result['layout_error'] = f'Error extracting PPTX layout: {str(e)}'
+
+        return result
+
     except FileNotFoundError:
+        metrics.inc('pptx_files_total', status='not_found')
         return {
             'success': False,
             'error': f'File not found: {file_path}'
         }
     except Exception as e:
+        metrics.inc('pptx_files_total', status='error')
         return {
             'success': False,
             'error': f'Error extracting PPTX: {str(e)}'
         }
 
 if __name__ == '__main__':
-    if len(sys.argv) != 2:
+    flags = {a for a in sys.argv[1:] if a.startswith('--')}
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if len(args) != 1 or flags - {'--layout'}:
         print(json.dumps({
             'success': False,
-            'error': 'Usage: python extract_pptx.py <file_path>'
+            'error': 'Usage: python extract_pptx.py <file_path> [--layout]'
         }))
         sys.exit(1)
 
-    file_path = sys.argv[1]
-    result = extract_text_from_pptx(file_path)
+    file_path = args[0]
+    with metrics.timer('pptx_extract_seconds'):
+        result = extract_text_from_pptx(file_path, layout='--layout' in flags)
     print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -15,13 +15,20 @@ from pptx import Presentation
 from pptx.enum.shapes import MSO_SHAPE_TYPE
 from PIL import Image
 
+from pptx_index import build_deck_index
+from pptx_layout import ImageSet, extract_layout
+from telemetry import registry
+
+metrics = registry()
+
 # Set UTF-8 encoding for stdout on Windows
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
-def extract_images_from_slide(slide, slide_number, output_dir):
-    """Extract all images from a single slide"""
+def extract_images_from_slide(slide, slide_number, output_dir, image_set=None):
+    """Extract all images from a single slide (identical images are written once)"""
     images = []
+    image_set = image_set if image_set is not None else ImageSet(output_dir)
 
     for shape_idx, shape in enumerate(slide.shapes):
         # Check if shape has an image
@@ -35,26 +42,26 @@ def extract_images_from_slide(slide, slide_number, output_dir):
                 content_type = image.content_type
                 ext = content_type.split('/')[-1] if '/' in content_type else 'png'
 
-                # Generate filename
-                filename = f"slide_{slide_number}_img_{shape_idx + 1}.{ext}"
-                filepath = os.path.join(output_dir, filename)
+                # Save the image (the first occurrence names the file, repeats reuse it)
+                entry = image_set.add(image, f"slide_{slide_number}_img_{shape_idx + 1}.{ext}")
 
-                # Save the image
-                with open(filepath, 'wb') as f:
-                    f.write(image_bytes)
+                # Short base64 prefix for logging (75 bytes encode to the same 100 characters)
+                image_base64 = base64.b64encode(image_bytes[:75]).decode('utf-8')
 
-                # Also create a base64 version for immediate use
-                image_base64 = base64.b64encode(image_bytes).decode('utf-8')
+                metrics.inc('pptx_images_total')
+                metrics.inc('pptx_image_bytes_total', len(image_bytes))
 
                 images.append({
-                    'filename': filename,
-                    'path': filepath,
+                    'filename': entry['filename'],
+                    'path': entry['path'],
+                    'image_id': entry['image_id'],
                     'content_type': content_type,
                     'size': len(image_bytes),
-                    'base64': f"data:{content_type};base64,{image_base64[:100]}..."  # Truncated for logging
+                    'base64': f"data:{content_type};base64,{image_base64}..."  # Truncated for logging
                 })
 
             except Exception as e:
+                metrics.inc('pptx_image_errors_total')
                 print(f"Warning: Failed to extract image from slide {slide_number}, shape {shape_idx}: {e}", file=sys.stderr)
 
     return images
@@ -102,11 +109,12 @@ def extract_text_from_slide(slide, slide_number):
         'text_count': len(texts)
     }
 
-def extract_pptx_data(file_path, output_dir=None):
-    """Extract text and images from all slides in a PowerPoint file"""
+def extract_pptx_data(file_path, output_dir=None, layout=False):
+    """Extract text and images from all slides in a PowerPoint file (plus layout geometry if requested)"""
     try:
         # Load presentation
-        prs = Presentation(file_path)
+        with metrics.timer('pptx_load_seconds'):
+            prs = Presentation(file_path)
 
         # Create output directory for images if specified
         if output_dir and not os.path.exists(output_dir):
@@ -127,14 +135,17 @@ def extract_pptx_data(file_path, output_dir=None):
         # Extract text and images from each slide
         slides = []
         all_images = []
+        image_set = ImageSet(output_dir)
 
         for idx, slide in enumerate(prs.slides, start=1):
             # Extract text
-            slide_data = extract_text_from_slide(slide, idx)
+            with metrics.timer('pptx_slide_seconds'):
+                slide_data = extract_text_from_slide(slide, idx)
 
             # Extract images if output directory is provided
             if output_dir:
-                images = extract_images_from_slide(slide, idx, output_dir)
+                with metrics.timer('pptx_slide_images_seconds'):
+                    images = extract_images_from_slide(slide, idx, output_dir, image_set)
                 slide_data['images'] = images
                 all_images.extend(images)
 
@@ -148,7 +159,12 @@ def extract_pptx_data(file_path, output_dir=None):
 
         full_text = '\n\n'.join(full_text_parts)
 
-        return {
+        metrics.inc('pptx_files_total', status='ok')
+        metrics.inc('pptx_slides_total', len(slides))
+        metrics.inc('pptx_characters_total', len(full_text))
+        metrics.inc('pptx_image_duplicates_total', image_set.duplicates)
+
+        result = {
             'success': True,
             'metadata': metadata,
             'slides': slides,
@@ -160,27 +176,55 @@ def extract_pptx_data(file_path, output_dir=None):
             'images': all_images
         }
 
+        # Titles, outline and term -> slide positions for local navigation lookups;
+        # like the layout it is optional, a deck it cannot index still returns its text
+        try:
+            with metrics.timer('pptx_index_seconds'):
+                result['deck_index'] = build_deck_index(prs, slides)
+        except Exception as e:
+            metrics.inc('pptx_index_errors_total')
+            result['deck_index'] = None
+            result['deck_index_error'] = f'Error building PPTX deck index: {str(e)}'
+
+        # Slide geometry for previews, pictures pointing into the same deduplicated image set
+        if layout:
+            # Geometry is optional: a deck it cannot handle still returns its text
+            try:
+                with metrics.timer('pptx_layout_seconds'):
+                    result['layout'] = extract_layout(prs, image_set)
+            except Exception as e:
+                metrics.inc('pptx_layout_errors_total')
+                result['layout'] = None
+                result['layout_error'] = f'Error extracting PPTX layout: {str(e)}'
+
+        return result
+
     except FileNotFoundError:
+        metrics.inc('pptx_files_total', status='not_found')
         return {
             'success': False,
             'error': f'File not found: {file_path}'
         }
     except Exception as e:
+        metrics.inc('pptx_files_total', status='error')
         return {
             'success': False,
             'error': f'Error extracting PPTX: {str(e)}'
         }
 
 if __name__ == '__main__':
-    if len(sys.argv) < 2:
+    flags = {a for a in sys.argv[1:] if a.startswith('--')}
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if not 1 <= len(args) <= 2 or flags - {'--layout'}:
         print(json.dumps({
             'success': False,
-            'error': 'Usage: python extract_pptx_with_images.py <file_path> [output_dir]'
+            'error': 'Usage: python extract_pptx_with_images.py <file_path> [output_dir] [--layout]'
         }))
         sys.exit(1)
 
-    file_path = sys.argv[1]
-    output_dir = sys.argv[2] if len(sys.argv) > 2 else None
+    file_path = args[0]
+    output_dir = args[1] if len(args) > 1 else None
 
-    result = extract_pptx_data(file_path, output_dir)
+    with metrics.timer('pptx_extract_seconds'):
+        result = extract_pptx_data(file_path, output_dir, layout='--layout' in flags)
     print(json.dumps(result, indent=2, ensure_ascii=False))
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Per-deck navigation index for PowerPoint (.pptx) files
+Slide titles (from title placeholders), an outline (sections > slides >
+bullet levels) and an inverted term -> slide -> token positions map, built
+at extraction time so "which slide talks about X" is a local lookup
+"""
+
+import sys
+import json
+import io
+import re
+import time
+import unicodedata
+
+# Set UTF-8 encoding for stdout on Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+INDEX_VERSION = 2
+WORD = re.compile(r'\w+')
+P14_SECTION = '{http://schemas.microsoft.com/office/powerpoint/2010/main}section'
+P14_SLIDE_ID = '{http://schemas.microsoft.com/office/powerpoint/2010/main}sldId'
+MAX_ITEM_CHARS = 120
+TITLE_BOOST = 3.0
+PHRASE_BOOST = 2.0
+
+# English and Portuguese function words plus navigation phrasing ("which slide talks about ...")
+STOPWORDS = set('''
+a an and are as at be by do does for from how in is it of on or the this that to what where which who with
+about talk talks mention mentions slide slides deck presentation page show shows
+o os as um uma uns umas e de do da dos das em no na nos nas por para com que qual quais onde como
+sobre fala falam slides apresentacao pagina mostra
+'''.split())
+
+
+def normalize(text):
+    """Lowercase and strip accents so 'Preço' and 'preco' index the same"""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def stem(term):
+    """Light suffix stripping so 'pricing', 'priced', 'prices' and 'price' all become 'pric'"""
+    for suffix in ('ing', 'ed', 'es', 's'):
+        if len(term) > len(suffix) + 3 and term.endswith(suffix) and not (suffix == 's' and term.endswith('ss')):
+            term = term[:-len(suffix)]
+            break
+    # Drop a trailing 'e' as well, otherwise 'price' and 'pric(ing)' never meet
+    if len(term) > 4 and term.endswith('e'):
+        term = term[:-1]
+    return term
+
+
+def tokenize(text):
+    """Index terms of `text` with their token positions (stopwords keep their position slot)"""
+    terms = []
+    for position, word in enumerate(WORD.findall(normalize(text))):
+        if word not in STOPWORDS and (len(word) > 1 or word.isdigit()):
+            terms.append((stem(word), position))
+    return terms
+
+
+def slide_title(slide):
+    """Text of the slide's title placeholder (title / centered title / vertical title), if any"""
+    title = slide.shapes.title
+    return title.text.strip() if title is not None and title.has_text_frame else ''
+
+
+def slide_items(slide, title_shape_id=None):
+    """Outline entries of a slide: non-empty paragraphs of its text frames with their indent level"""
+    items = []
+    for shape in slide.shapes:
+        if not shape.has_text_frame or shape.shape_id == title_shape_id:
+            continue
+        for paragraph in shape.text_frame.paragraphs:
+            text = paragraph.text.strip()
+            if text:
+                items.append({'text': text[:MAX_ITEM_CHARS], 'level': paragraph.level})
+    return items
+
+
+def deck_sections(prs):
+    """[(section name, [slide ids])] from the PowerPoint 2010 section list, if the deck has one"""
+    return [(section.get('name'), [int(s.get('id')) for s in section.iter(P14_SLIDE_ID)])
+            for section in prs.element.iter(P14_SECTION)]
+
+
+def build_deck_index(prs, slides):
+    """Index for a loaded presentation; `slides` are the extractor's slide dicts (slide_number, content)"""
+    titles = []
+    outline_slides = {}
+    for number, slide in enumerate(prs.slides, start=1):
+        title = slide_title(slide)
+        title_shape = slide.shapes.title if title else None
+        if title:
+            titles.append({'slide': number, 'title': title})
+        outline_slides[slide.slide_id] = {
+            'slide': number,
+            'title': title,
+            'items': slide_items(slide, title_shape.shape_id if title_shape is not None else None)
+        }
+
+    sections = deck_sections(prs)
+    outline = []
+    placed = set()
+    for name, slide_ids in sections:
+        entries = [outline_slides[i] for i in slide_ids if i in outline_slides]
+        placed.update(slide_ids)
+        outline.append({'section': name, 'slides': entries})
+    remaining = [entry for slide_id, entry in outline_slides.items() if slide_id not in placed]
+    if remaining:
+        outline.append({'section': None, 'slides': remaining})
+
+    terms = {}
+    for s in slides:
+        postings = {}
+        for term, position in tokenize(s['content']):
+            postings.setdefault(term, []).append(position)
+        for term, positions in postings.items():
+            terms.setdefault(term, []).append([s['slide_number'], positions])
+
+    return {
+        'version': INDEX_VERSION,
+        'titles': titles,
+        'outline': outline,
+        'terms': terms
+    }
+
+
+class DeckIndex:
+    """Lookup API over a deck_index produced at extraction time"""
+    def __init__(self, data):
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported deck index version: {data.get('version')}")
+        self.terms = data['terms']
+        self.titles = {t['slide']: t['title'] for t in data['titles']}
+        self.title_terms = {slide: {term for term, _ in tokenize(title)} for slide, title in self.titles.items()}
+
+    def search(self, query, k=3):
+        """Slides most relevant to `query`: [{slide, title, score, matches: {term: positions}}]"""
+        query_terms = [term for term, _ in tokenize(query)]
+        scores = {}
+        matches = {}
+        for term in dict.fromkeys(query_terms):
+            for slide, positions in self.terms.get(term, ()):
+                scores[slide] = scores.get(slide, 0.0) + len(positions) + (TITLE_BOOST if term in self.title_terms.get(slide, ()) else 0.0)
+                matches.setdefault(slide, {})[term] = positions
+
+        # Consecutive query terms found next to each other ("gross margin") rank higher
+        for first, second in zip(query_terms, query_terms[1:]):
+            for slide, found in matches.items():
+                if first in found and second in found:
+                    following = set(found[second])
+                    if any(p + 1 in following or p + 2 in following for p in found[first]):
+                        scores[slide] += PHRASE_BOOST
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [{'slide': slide, 'title': self.titles.get(slide, ''), 'score': score, 'matches': matches[slide]}
+                for slide, score in ranked]
+
+    def slide_for_title(self, title):
+        """Exact (accent/case-insensitive) title lookup"""
+        wanted = normalize(title).strip()
+        for slide, text in self.titles.items():
+            if normalize(text).strip() == wanted:
+                return slide
+        return None
+
+
+def load_deck_index(path):
+    """deck_index from an extractor JSON result, or built directly from a .pptx"""
+    if path.lower().endswith('.pptx'):
+        from pptx import Presentation
+        from extract_pptx import extract_text_from_slide
+        prs = Presentation(path)
+        slides = [extract_text_from_slide(slide, i) for i, slide in enumerate(prs.slides, start=1)]
+        return build_deck_index(prs, slides)
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return data.get('deck_index', data)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3:
+        print(json.dumps({
+            'success': False,
+            'error': 'Usage: python pptx_index.py <file.pptx | extraction.json> <query> [query ...]'
+        }))
+        sys.exit(1)
+
+    try:
+        index = DeckIndex(load_deck_index(sys.argv[1]))
+    except Exception as e:
+        print(json.dumps({'success': False, 'error': f'Error loading deck index: {str(e)}'}))
+        sys.exit(1)
+
+    results = []
+    for query in sys.argv[2:]:
+        start = time.perf_counter()
+        for _ in range(1000):
+            hits = index.search(query)
+        results.append({'query': query, 'results': hits, 'lookup_us': round((time.perf_counter() - start) * 1000, 2)})
+    print(json.dumps({'success': True, 'queries': results}, indent=2, ensure_ascii=False))
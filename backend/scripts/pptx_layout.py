@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Slide layout geometry for PowerPoint (.pptx) previews
+Exports slide size, shape bounding boxes in z-order, text runs with font
+size/bold and references into a deduplicated image set, so the frontend can
+draw a preview without converting the deck to PDF
+"""
+
+import sys
+import json
+import io
+import os
+import gzip
+import time
+from pptx import Presentation
+from pptx.enum.shapes import MSO_SHAPE_TYPE
+from pptx.oxml.ns import qn
+
+# Set UTF-8 encoding for stdout on Windows
+if sys.platform == 'win32':
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+LAYOUT_VERSION = 1
+EMU_PER_PT = 12700
+
+
+def pt(emu):
+    """EMU -> points, rounded to 0.1pt (keeps the payload compact)"""
+    return round(emu / EMU_PER_PT, 1)
+
+
+class ImageSet:
+    """Images keyed by content hash, so a logo repeated on every slide is stored once"""
+    def __init__(self, output_dir=None):
+        self.output_dir = output_dir
+        self.entries = {}
+        self.duplicates = 0
+
+    def add(self, image, filename=None):
+        """Register an image (python-pptx Image); writes it on first sight when output_dir is set"""
+        image_id = image.sha1[:16]
+        if image_id not in self.entries:
+            entry = {
+                'image_id': image_id,
+                'content_type': image.content_type,
+                'size': len(image.blob)
+            }
+            try:
+                entry['width'], entry['height'] = image.size
+            except Exception:
+                pass
+            if self.output_dir:
+                entry['filename'] = filename or f"{image_id}.{image.ext}"
+                entry['path'] = os.path.join(self.output_dir, entry['filename'])
+                with open(entry['path'], 'wb') as f:
+                    f.write(image.blob)
+            self.entries[image_id] = entry
+        else:
+            self.duplicates += 1
+        return self.entries[image_id]
+
+    def to_list(self):
+        return list(self.entries.values())
+
+
+class Transform:
+    """Maps a group's child coordinate space onto slide coordinates"""
+    def __init__(self, parent=None, group=None):
+        self.scale_x, self.scale_y, self.dx, self.dy = 1.0, 1.0, 0.0, 0.0
+        # A group without (complete) a:xfrm keeps the identity mapping of its parent
+        props = group.element.find(qn('p:grpSpPr')) if group is not None else None
+        xfrm = props.find(qn('a:xfrm')) if props is not None else None
+        if xfrm is not None:
+            off, ext = xfrm.find(qn('a:off')), xfrm.find(qn('a:ext'))
+            ch_off, ch_ext = xfrm.find(qn('a:chOff')), xfrm.find(qn('a:chExt'))
+            if None not in (off, ext, ch_off, ch_ext):
+                self.scale_x = int(ext.get('cx')) / (int(ch_ext.get('cx')) or 1)
+                self.scale_y = int(ext.get('cy')) / (int(ch_ext.get('cy')) or 1)
+                self.dx = int(off.get('x')) - int(ch_off.get('x')) * self.scale_x
+                self.dy = int(off.get('y')) - int(ch_off.get('y')) * self.scale_y
+        if parent is not None:
+            self.dx = parent.dx + self.dx * parent.scale_x
+            self.dy = parent.dy + self.dy * parent.scale_y
+            self.scale_x *= parent.scale_x
+            self.scale_y *= parent.scale_y
+
+    def box(self, shape):
+        """[x, y, width, height] in points, or None when the shape has no resolvable position"""
+        # Each property read can walk placeholder inheritance, so read them once
+        left, top, width, height = shape.left, shape.top, shape.width, shape.height
+        if None in (left, top, width, height):
+            return None
+        return [pt(self.dx + left * self.scale_x), pt(self.dy + top * self.scale_y),
+                pt(width * self.scale_x), pt(height * self.scale_y)]
+
+
+def text_paragraphs(text_frame):
+    """Paragraphs as runs with explicit font size/bold (omitted when inherited from the layout)"""
+    paragraphs = []
+    for paragraph in text_frame.paragraphs:
+        runs = []
+        for run in paragraph.runs:
+            if not run.text:
+                continue
+            entry = {'text': run.text}
+            if run.font.size is not None:
+                entry['size'] = run.font.size.pt
+            if run.font.bold is not None:
+                entry['bold'] = run.font.bold
+            runs.append(entry)
+        if runs:
+            item = {'runs': runs}
+            if paragraph.level:
+                item['level'] = paragraph.level
+            paragraphs.append(item)
+    return paragraphs
+
+
+def shape_kind(shape):
+    if shape.shape_type == MSO_SHAPE_TYPE.GROUP:
+        return 'group'
+    if shape.shape_type == MSO_SHAPE_TYPE.PICTURE or hasattr(shape, 'image'):
+        return 'picture'
+    if shape.has_table:
+        return 'table'
+    if shape.has_chart:
+        return 'chart'
+    return 'text' if shape.has_text_frame and shape.text_frame.text.strip() else 'shape'
+
+
+def walk_shapes(shapes, transform, image_set, out, group_id=None):
+    """Append shapes depth-first in document order, which is PowerPoint's z-order (back to front)"""
+    for shape in shapes:
+        kind = shape_kind(shape)
+        entry = {'id': shape.shape_id, 'z': len(out), 'kind': kind, 'box': transform.box(shape)}
+        if shape.rotation:
+            entry['rotation'] = shape.rotation
+        if group_id is not None:
+            entry['group'] = group_id
+        if shape.is_placeholder:
+            entry['placeholder'] = str(shape.placeholder_format.type).split()[0].lower()
+        out.append(entry)
+
+        if kind == 'group':
+            walk_shapes(shape.shapes, Transform(transform, shape), image_set, out, shape.shape_id)
+        elif kind == 'picture':
+            try:
+                entry['image'] = image_set.add(shape.image)['image_id']
+            except Exception:
+                entry['image'] = None  # linked or missing image
+        elif kind == 'table':
+            entry['rows'] = [[cell.text.strip() for cell in row.cells] for row in shape.table.rows]
+        elif shape.has_text_frame:
+            paragraphs = text_paragraphs(shape.text_frame)
+            if paragraphs:
+                entry['paragraphs'] = paragraphs
+    return out
+
+
+def slide_layout(slide, slide_number, image_set):
+    return {'slide': slide_number, 'shapes': walk_shapes(slide.shapes, Transform(), image_set, [])}
+
+
+def extract_layout(prs, image_set=None):
+    """Layout for every slide plus the deduplicated image set the picture shapes point into"""
+    image_set = image_set if image_set is not None else ImageSet()
+    slides = [slide_layout(slide, idx, image_set) for idx, slide in enumerate(prs.slides, start=1)]
+    return {
+        'version': LAYOUT_VERSION,
+        'unit': 'pt',
+        'slide_width': pt(prs.slide_width),
+        'slide_height': pt(prs.slide_height),
+        'slides': slides,
+        'image_set': image_set.to_list()
+    }
+
+
+def benchmark(file_path, repeat=3):
+    """Extraction cost and payload size per slide, text-only vs layout export"""
+    from extract_pptx import extract_text_from_slide
+
+    start = time.perf_counter()
+    prs = Presentation(file_path)
+    load = time.perf_counter() - start
+    count = len(prs.slides) or 1
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        texts = [extract_text_from_slide(slide, i) for i, slide in enumerate(prs.slides, start=1)]
+    text_time = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        layout = extract_layout(prs)
+    layout_time = (time.perf_counter() - start) / repeat
+
+    text_payload = json.dumps(texts, ensure_ascii=False).encode('utf-8')
+    layout_payload = json.dumps(layout, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    shapes = sum(len(s['shapes']) for s in layout['slides'])
+
+    print("=" * 60)
+    print(f"PPTX layout benchmark: {os.path.basename(file_path)} ({count} slides, {shapes} shapes, "
+          f"{len(layout['image_set'])} unique images)")
+    print("=" * 60)
+    print(f"  load              {load * 1000:8.1f} ms")
+    print(f"  text extraction   {text_time * 1000 / count:8.2f} ms/slide   {len(text_payload) / count:8.0f} B/slide")
+    print(f"  layout export     {layout_time * 1000 / count:8.2f} ms/slide   {len(layout_payload) / count:8.0f} B/slide "
+          f"({len(gzip.compress(layout_payload)) / count:.0f} B/slide gzipped)")
+
+
+if __name__ == '__main__':
+    flags = {a for a in sys.argv[1:] if a.startswith('--')}
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if len(args) != 1 or flags - {'--benchmark'}:
+        print(json.dumps({
+            'success': False,
+            'error': 'Usage: python pptx_layout.py <file_path> [--benchmark]'
+        }))
+        sys.exit(1)
+
+    if '--benchmark' in flags:
+        benchmark(args[0])
+    else:
+        try:
+            result = {'success': True, 'layout': extract_layout(Presentation(args[0]))}
+        except Exception as e:
+            result = {'success': False, 'error': f'Error extracting PPTX layout: {str(e)}'}
+        print(json.dumps(result, ensure_ascii=False, separators=(',', ':')))
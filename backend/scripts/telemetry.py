@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Shared metrics for the Python tools (extractors, cleanup scripts, training-data pipeline)
+Counters, gauges, histograms and stage timers, written on exit as a JSON
+summary or a Prometheus textfile-collector file; a no-op unless enabled
+
+Enable with the KODA_METRICS environment variable:
+    KODA_METRICS=/var/lib/node_exporter/textfile   directory: <dir>/koda_<job>.prom
+    KODA_METRICS=metrics/{job}.prom                 Prometheus text format
+    KODA_METRICS=metrics/{job}.json                 JSON summary
+    KODA_METRICS=-                                  JSON summary on stderr
+"""
+
+import atexit
+import bisect
+import json
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+
+PREFIX = 'koda_'
+# Prometheus client defaults, in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+NAME = re.compile(r'[^a-zA-Z0-9_]')
+
+
+def _key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+class _Timer:
+    """Context manager observing the elapsed seconds into a histogram"""
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+
+NULL_TIMER = _NullTimer()
+
+
+class NullRegistry:
+    """Used when metrics are disabled: every call returns immediately"""
+    enabled = False
+
+    def inc(self, name, value=1, **labels):
+        pass
+
+    def set(self, name, value, **labels):
+        pass
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS, **labels):
+        pass
+
+    def timer(self, name, **labels):
+        return NULL_TIMER
+
+    def flush(self):
+        pass
+
+
+class Registry:
+    """In-process metric store for one job, written out by flush(); safe to share between threads"""
+    enabled = True
+
+    def __init__(self, job, target):
+        self.lock = threading.Lock()
+        self.job = job
+        self.target = target
+        self.started = time.time()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        key = _key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        key = _key(labels)
+        with self.lock:
+            self.gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS, **labels):
+        key = _key(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            h = series.get(key)
+            if h is None:
+                h = series[key] = {'buckets': buckets, 'counts': [0] * (len(buckets) + 1),
+                                   'count': 0, 'sum': 0.0, 'min': value, 'max': value}
+            h['counts'][bisect.bisect_left(h['buckets'], value)] += 1
+            h['count'] += 1
+            h['sum'] += value
+            h['min'] = min(h['min'], value)
+            h['max'] = max(h['max'], value)
+
+    def timer(self, name, **labels):
+        """with metrics.timer('stage_seconds', stage='load'): ..."""
+        return _Timer(self, name, labels)
+
+    def summary(self):
+        """JSON-friendly view of every series"""
+        def series(store, render):
+            return {name: [dict(labels=dict(key), **render(v)) for key, v in values.items()]
+                    for name, values in sorted(store.items())}
+        return {
+            'job': self.job,
+            'started': self.started,
+            'duration_seconds': round(time.time() - self.started, 6),
+            'counters': series(self.counters, lambda v: {'value': v}),
+            'gauges': series(self.gauges, lambda v: {'value': v}),
+            'histograms': series(self.histograms, lambda h: {
+                'count': h['count'], 'sum': round(h['sum'], 6), 'min': h['min'], 'max': h['max'],
+                'buckets': {str(le): c for le, c in zip(list(h['buckets']) + ['+Inf'], _cumulative(h['counts']))}
+            })
+        }
+
+    def prometheus(self):
+        """Prometheus text exposition format (for the node_exporter textfile collector)"""
+        job = (('script', self.job),)
+        lines = []
+        for name, values in sorted(self.counters.items()):
+            metric = PREFIX + name
+            lines.append(f'# TYPE {metric} counter')
+            lines.extend(f'{metric}{_labels(key, job)} {v}' for key, v in values.items())
+        gauges = dict(self.gauges)
+        gauges['last_run_timestamp_seconds'] = {(): round(time.time(), 3)}
+        gauges['last_run_duration_seconds'] = {(): round(time.time() - self.started, 6)}
+        for name, values in sorted(gauges.items()):
+            metric = PREFIX + name
+            lines.append(f'# TYPE {metric} gauge')
+            lines.extend(f'{metric}{_labels(key, job)} {v}' for key, v in values.items())
+        for name, values in sorted(self.histograms.items()):
+            metric = PREFIX + name
+            lines.append(f'# TYPE {metric} histogram')
+            for key, h in values.items():
+                for le, count in zip(list(h['buckets']) + ['+Inf'], _cumulative(h['counts'])):
+                    lines.append(f'{metric}_bucket{_labels(key, job + (("le", le),))} {count}')
+                lines.append(f'{metric}_sum{_labels(key, job)} {h["sum"]}')
+                lines.append(f'{metric}_count{_labels(key, job)} {h["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def flush(self):
+        """Write the metrics to the configured target (atomically for files)"""
+        target = self.target
+        if target == '-':
+            sys.stderr.write(json.dumps(self.summary(), indent=2) + '\n')
+            return
+        if os.path.isdir(target):
+            target = os.path.join(target, f'{PREFIX}{self.job}.prom')
+        else:
+            target = target.replace('{job}', self.job)
+        payload = self.prometheus() if target.endswith('.prom') else json.dumps(self.summary(), indent=2) + '\n'
+        tmp = f'{target}.{os.getpid()}.tmp'
+        try:
+            directory = os.path.dirname(target)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp, target)
+        except OSError as e:
+            print(f"Warning: could not write metrics to {target}: {e}", file=sys.stderr)
+
+
+def _cumulative(counts):
+    total = 0
+    out = []
+    for c in counts:
+        total += c
+        out.append(total)
+    return out
+
+
+def job_name(argv0=None):
+    """Job label from the script name: clean-console-logs.py -> clean_console_logs"""
+    stem = os.path.splitext(os.path.basename(argv0 or sys.argv[0] or 'python'))[0]
+    return NAME.sub('_', stem) or 'python'
+
+
+_registry = None
+
+
+def registry(job=None):
+    """The process-wide registry: a Registry flushed at exit when KODA_METRICS is set, else a NullRegistry
+
+    Pool worker processes always get a NullRegistry so they never overwrite
+    the parent's output; record per-item metrics in the parent instead.
+    """
+    global _registry
+    if _registry is None:
+        target = os.environ.get('KODA_METRICS', '').strip()
+        if target and multiprocessing.parent_process() is None:
+            _registry = Registry(job or job_name(), target)
+            atexit.register(_registry.flush)
+        else:
+            _registry = NullRegistry()
+    return _registry
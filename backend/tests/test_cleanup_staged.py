@@ -0,0 +1,80 @@
+"""
+Tests for the --staged cleanup mode (cleanup_staged.py)
+Run with: python -m pytest backend/tests
+"""
+
+import importlib.util
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+from cleanup_staged import clean_hunks, statements
+
+spec = importlib.util.spec_from_file_location('clean_console_logs', os.path.join(BACKEND, 'clean-console-logs.py'))
+clean_console_logs = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(clean_console_logs)
+RULES = clean_console_logs.RULES
+
+OLD = [
+    "function f() {\n",
+    "  const a = 1;\n",
+    "  console.log('old 30');\n",
+]
+NEW = [
+    "  console.log(\n",
+    "    'new', a\n",
+    "  );\n",
+]
+TAIL = [
+    "  return a;\n",
+    "}\n",
+]
+
+
+def test_statements_splits_adjacent_console_calls():
+    assert statements(OLD[2:] + NEW, RULES) == [(0, 1), (1, 4)]
+
+
+def test_clean_hunks_keeps_untouched_adjacent_statement():
+    lines = OLD + NEW + TAIL
+    staged = [(len(OLD), len(OLD) + len(NEW))]
+
+    cleaned, _ = clean_hunks(lines, staged, RULES, context=20)
+
+    assert cleaned == OLD + TAIL
+
+
+def test_clean_hunks_stats_count_only_kept_deletions():
+    lines = OLD + NEW + TAIL
+    staged = [(len(OLD), len(OLD) + len(NEW))]
+
+    cleaned, stats = clean_hunks(lines, staged, RULES, context=20)
+
+    assert sum(s['lines_removed'] for s in stats) == len(lines) - len(cleaned) == len(NEW)
+    assert sum(s['bytes_saved'] for s in stats) == len(''.join(NEW).encode('utf-8'))
+
+
+def test_staged_mode_does_not_delete_unstaged_lines(tmp_path):
+    def git(*args):
+        subprocess.run(['git', *args], cwd=tmp_path, check=True, capture_output=True)
+
+    source = tmp_path / 'a.ts'
+    git('init', '-q')
+    git('config', 'user.email', 'test@example.com')
+    git('config', 'user.name', 'test')
+    source.write_text(''.join(OLD + TAIL))
+    git('add', 'a.ts')
+    git('commit', '-q', '-m', 'base')
+    source.write_text(''.join(OLD + NEW + TAIL))
+    git('add', 'a.ts')
+
+    subprocess.run([sys.executable, os.path.join(BACKEND, 'clean-console-logs.py'), '--staged'],
+                   cwd=tmp_path, check=True, capture_output=True)
+
+    diff = subprocess.run(['git', 'diff', '--cached'], cwd=tmp_path, check=True,
+                          capture_output=True, text=True).stdout
+    assert diff == ''
+    assert source.read_text() == ''.join(OLD + TAIL)
@@ -0,0 +1,54 @@
+"""
+Tests for the dead export analyzer's module parser (dead_exports.py)
+Run with: python -m pytest backend/tests
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dead_exports import parse_module, strip_comments
+
+
+def test_default_export_does_not_export_its_name():
+    parsed = parse_module("export default function main() {}\nexport default class App {}\n")
+    assert parsed['exports'] == ['default']
+
+
+def test_named_declarations_and_export_after_statement():
+    parsed = parse_module("export const a = 1;\nexport async function load() {}\nfoo(); export const t = 1\n")
+    assert parsed['exports'] == ['a', 'load', 't']
+
+
+def test_reexports_and_export_star():
+    parsed = parse_module(
+        "export { a as b, c } from './x';\n"
+        "export * from './y';\n"
+        "export * as ns from './z';\n"
+    )
+    assert parsed['exports'] == ['b', 'c', 'ns']
+    assert parsed['reexports'] == [['./x', 'a', 'b'], ['./x', 'c', 'c']]
+    assert parsed['stars'] == ['./y']
+    assert ['./z', '*'] in parsed['imports']
+
+
+def test_commented_out_exports_are_ignored():
+    parsed = parse_module(
+        "// export const gone = 1;\n"
+        "/* export const gone2 = 2;\n"
+        "   export function gone3() {} */\n"
+        "export const kept = 3; // export const trailing = 4;\n"
+    )
+    assert parsed['exports'] == ['kept']
+
+
+def test_strip_comments_skips_string_and_template_literals():
+    code = "const g = '**' + name + '/**';\nexport const a = 1;\nconst t = `x${ {k: '/*'}.k }y // not a comment`;\n"
+    assert strip_comments(code) == code
+    assert parse_module(code)['exports'] == ['a']
+
+
+def test_strip_comments_removes_comments_outside_literals():
+    code = "a(); /* block\n comment */ b(); // tail\nc('//');\n"
+    assert strip_comments(code) == "a();  b(); \nc('//');\n"
@@ -0,0 +1,43 @@
+"""
+Tests for the streaming DOCX extractor (scripts/extract_docx.py)
+Run with: python -m pytest backend/tests
+"""
+
+import os
+import sys
+
+import pytest
+
+docx = pytest.importorskip('docx')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from docx.enum.section import WD_SECTION
+
+from extract_docx import extract_text_from_docx
+
+
+def two_section_document(path):
+    """Two sections, each with its own header part carrying the same text, plus a shared footer"""
+    document = docx.Document()
+    document.sections[0].header.paragraphs[0].text = 'ACME Confidential'
+    document.sections[0].footer.paragraphs[0].text = 'Page footer'
+    document.add_paragraph('First section body')
+
+    second = document.add_section(WD_SECTION.NEW_PAGE)
+    second.header.is_linked_to_previous = False
+    second.header.paragraphs[0].text = 'ACME Confidential'
+    document.add_paragraph('Second section body')
+    document.save(path)
+    return path
+
+
+def test_repeated_headers_are_emitted_once_after_the_body(tmp_path):
+    result = extract_text_from_docx(two_section_document(str(tmp_path / 'two.docx')))
+
+    assert result['success'] is True
+    kinds = [b['type'] for b in result['blocks']]
+    assert kinds == ['paragraph', 'paragraph', 'header', 'footer']
+    assert result['blocks'][2]['sections'] == [1, 2]
+    assert result['full_text'].count('ACME Confidential') == 1
+    assert result['full_text'].index('Second section body') < result['full_text'].index('ACME Confidential')
@@ -0,0 +1,63 @@
+"""
+Tests for the per-deck navigation index (scripts/pptx_index.py)
+Run with: python -m pytest backend/tests
+"""
+
+import os
+import sys
+
+import pytest
+
+pptx = pytest.importorskip('pptx')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+import extract_pptx
+from extract_pptx import extract_text_from_slide
+from pptx_index import DeckIndex, build_deck_index, stem
+
+
+def make_deck(slides):
+    """Presentation with one title-and-content slide per (title, body) pair"""
+    prs = pptx.Presentation()
+    for title, body in slides:
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = title
+        slide.placeholders[1].text = body
+    return prs
+
+
+def test_stem_joins_inflections():
+    assert stem('pricing') == stem('priced') == stem('prices') == stem('price')
+    assert stem('classes') == stem('class')
+
+
+def test_search_finds_price_slide_for_pricing_query():
+    prs = make_deck([
+        ('Agenda', 'Intro, roadmap and team'),
+        ('Price', 'Basic plan 10 USD, Pro plan 25 USD per seat'),
+        ('Hiring', 'Pricing of contractors was reviewed by HR'),
+    ])
+    slides = [extract_text_from_slide(slide, i) for i, slide in enumerate(prs.slides, start=1)]
+    index = DeckIndex(build_deck_index(prs, slides))
+
+    hits = index.search('which slide talks about pricing?')
+
+    assert [hit['slide'] for hit in hits] == [2, 3]
+    assert hits[0]['title'] == 'Price'
+
+
+def test_index_error_keeps_text(tmp_path, monkeypatch):
+    path = str(tmp_path / 'deck.pptx')
+    make_deck([('Price', 'Basic plan 10 USD')]).save(path)
+
+    def broken_index(prs, slides):
+        raise AttributeError('no section list')
+
+    monkeypatch.setattr(extract_pptx, 'build_deck_index', broken_index)
+    result = extract_pptx.extract_text_from_pptx(path)
+
+    assert result['success'] is True
+    assert 'Basic plan' in result['full_text']
+    assert result['deck_index'] is None
+    assert 'no section list' in result['deck_index_error']
@@ -0,0 +1,56 @@
+"""
+Tests for the slide layout export (scripts/pptx_layout.py)
+Run with: python -m pytest backend/tests
+"""
+
+import os
+import sys
+
+import pytest
+
+pptx = pytest.importorskip('pptx')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from pptx.oxml.ns import qn
+from pptx.util import Pt
+
+import extract_pptx
+from pptx_layout import extract_layout
+
+
+def deck_with_bare_group(path):
+    """One slide with a group whose grpSpPr has no a:xfrm"""
+    prs = pptx.Presentation()
+    slide = prs.slides.add_slide(prs.slide_layouts[5])
+    slide.shapes.title.text = 'Grouped'
+    group = slide.shapes.add_group_shape()
+    group.shapes.add_textbox(Pt(72), Pt(72), Pt(144), Pt(72)).text_frame.text = 'inside group'
+    props = group._element.grpSpPr
+    props.remove(props.find(qn('a:xfrm')))
+    prs.save(path)
+    return path
+
+
+def test_group_without_xfrm_uses_identity_transform(tmp_path):
+    prs = pptx.Presentation(deck_with_bare_group(str(tmp_path / 'deck.pptx')))
+
+    shapes = extract_layout(prs)['slides'][0]['shapes']
+
+    child = next(s for s in shapes if s.get('group') is not None)
+    assert child['box'] == [72.0, 72.0, 144.0, 72.0]
+
+
+def test_layout_error_keeps_text(tmp_path, monkeypatch):
+    path = deck_with_bare_group(str(tmp_path / 'deck.pptx'))
+
+    def broken_layout(prs):
+        raise ValueError('bad geometry')
+
+    monkeypatch.setattr(extract_pptx, 'extract_layout', broken_layout)
+    result = extract_pptx.extract_text_from_pptx(path, layout=True)
+
+    assert result['success'] is True
+    assert 'inside group' in result['full_text']
+    assert result['layout'] is None
+    assert 'bad geometry' in result['layout_error']
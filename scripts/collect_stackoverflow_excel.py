@@ -1,39 +1,379 @@
 #!/usr/bin/env python3
 """Collect Excel Q&A examples from StackOverflow"""
-import requests, json, time
+import argparse, hashlib, json, os, re, sys, threading, time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from pathlib import Path
-from bs4 import BeautifulSoup
+import requests
+from requests.adapters import HTTPAdapter
+from html_to_text import convert_many
 
-def fetch_excel_questions(limit=100):
-    params = {'order': 'desc', 'sort': 'votes', 'tagged': 'excel', 'site': 'stackoverflow', 'filter': 'withbody', 'pagesize': min(limit, 100)}
-    response = requests.get("https://api.stackexchange.com/2.3/questions", params=params)
-    return response.json().get('items', []) if response.status_code == 200 else []
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend' / 'scripts'))
+from telemetry import registry
 
-def fetch_answers(question_id):
-    params = {'order': 'desc', 'sort': 'votes', 'site': 'stackoverflow', 'filter': 'withbody', 'pagesize': 1}
-    response = requests.get(f"https://api.stackexchange.com/2.3/questions/{question_id}/answers", params=params)
-    answers = response.json().get('items', []) if response.status_code == 200 else []
-    return answers[0]['body'] if answers else None
+metrics = registry()
 
-def clean_html(text):
-    return BeautifulSoup(text, 'html.parser').get_text()
+API_URL = 'https://api.stackexchange.com/2.3'
+MAX_IDS_PER_REQUEST = 100  # the API accepts up to 100 semicolon-separated ids
+ID_LIST = re.compile(r'/[0-9;]+')  # collapsed in metric labels: /questions/{ids}/answers
+
+class QuotaExhausted(Exception):
+    """Raised when the API reports no remaining request quota"""
+
+class ResumeRefused(Exception):
+    """Raised when the output exists but cannot be resumed (no checkpoint or different settings)"""
+
+class RequestFailed(Exception):
+    """Raised when a request still fails after its retries; the page it belongs to stays pending"""
+
+class TokenBucket:
+    """Thread-safe token bucket that also honours the API's `backoff` field"""
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                wait = max(self.blocked_until - now, 0.0)
+                if not wait and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = wait or (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def backoff(self, seconds):
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+class ResponseCache:
+    """On-disk cache of API responses keyed by URL and params, with expiry"""
+    def __init__(self, directory, ttl_seconds):
+        self.directory = Path(directory)
+        self.ttl = ttl_seconds
+        self.hits = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, url, params):
+        params = {k: v for k, v in params.items() if k != 'key'}
+        digest = hashlib.sha256(json.dumps([url, sorted(params.items())], default=str).encode('utf-8')).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json"
+
+    def get(self, url, params):
+        path = self.path_for(url, params)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            metrics.inc('collect_cache_lookups_total', result='miss')
+            return None
+        if time.time() - entry['fetched_at'] > self.ttl:
+            metrics.inc('collect_cache_lookups_total', result='expired')
+            return None
+        self.hits += 1
+        metrics.inc('collect_cache_lookups_total', result='hit')
+        return entry['data']
+
+    def put(self, url, params, data):
+        path = self.path_for(url, params)
+        path.parent.mkdir(exist_ok=True)
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({'fetched_at': time.time(), 'url': url, 'data': data}, f)
+        os.replace(tmp, path)
+
+class StackExchangeClient:
+    """Pooled, rate-limited StackExchange API client"""
+    def __init__(self, api_url=API_URL, rate=10, key=None, pool_size=8, site='stackoverflow', cache=None):
+        self.api_url = api_url.rstrip('/')
+        self.cache = cache
+        self.limiter = TokenBucket(rate)
+        self.site = site
+        self.key = key
+        self.quota_remaining = None
+        self.requests_made = 0
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get(self, path, params, retries=3):
+        params = dict(params, site=self.site)
+        url = f"{self.api_url}{path}"
+        endpoint = ID_LIST.sub('/{ids}', path)
+        cached = self.cache.get(url, params) if self.cache else None
+        if cached is not None:
+            return cached
+        if self.key:
+            params['key'] = self.key
+        for attempt in range(retries + 1):
+            self.limiter.acquire()
+            # Pages already queued in the window must not spend requests past an exhausted quota
+            if self.quota_remaining == 0:
+                raise QuotaExhausted(path)
+            with metrics.timer('collect_api_request_seconds', endpoint=endpoint):
+                response = self.session.get(url, params=params, timeout=30)
+            self.requests_made += 1
+            metrics.inc('collect_api_requests_total', endpoint=endpoint, status=response.status_code)
+            try:
+                data = response.json()
+            except ValueError:
+                data = {}
+            if 'backoff' in data:
+                metrics.inc('collect_api_backoffs_total')
+                self.limiter.backoff(data['backoff'])
+            if 'quota_remaining' in data:
+                self.quota_remaining = data['quota_remaining']
+            if response.status_code == 200:
+                if self.cache:
+                    self.cache.put(url, params, data)
+                if self.quota_remaining == 0:
+                    raise QuotaExhausted(path)
+                return data
+            if data.get('error_name') == 'throttle_violation' and attempt < retries:
+                self.limiter.backoff(2 ** attempt)
+                continue
+            raise RequestFailed(f"{endpoint}: HTTP {response.status_code} {data.get('error_name', '')}".rstrip())
+
+    def fetch_questions_page(self, page, pagesize=100, tagged='excel'):
+        params = {'order': 'desc', 'sort': 'votes', 'tagged': tagged, 'filter': 'withbody', 'page': page, 'pagesize': min(pagesize, 100)}
+        return self.get('/questions', params)
+
+    def fetch_top_answers(self, question_ids):
+        """Top-voted answer body per question, looked up in batches of up to 100 ids"""
+        best = {}
+        ids = list(question_ids)
+        for i in range(0, len(ids), MAX_IDS_PER_REQUEST):
+            batch = ';'.join(str(q) for q in ids[i:i + MAX_IDS_PER_REQUEST])
+            page = 1
+            while True:
+                params = {'order': 'desc', 'sort': 'votes', 'filter': 'withbody', 'page': page, 'pagesize': 100}
+                data = self.get(f"/questions/{batch}/answers", params)
+                for answer in data.get('items', []):
+                    current = best.get(answer['question_id'])
+                    if current is None or answer['score'] > current['score']:
+                        best[answer['question_id']] = answer
+                if not data.get('has_more'):
+                    break
+                page += 1
+        return {qid: a['body'] for qid, a in best.items()}
+
+def fetch_excel_questions(limit=100, client=None):
+    client = client or StackExchangeClient()
+    return client.fetch_questions_page(1, limit).get('items', [])[:limit]
+
+def fetch_answers(question_id, client=None):
+    client = client or StackExchangeClient()
+    return client.fetch_top_answers([question_id]).get(question_id)
+
+QUESTION_CHARS = 500
+ANSWER_CHARS = 1000
+
+def build_examples(pairs, converter):
+    """Convert (question, answer_html) pairs to examples, HTML-to-text running in the worker pool"""
+    jobs = []
+    for q, answer in pairs:
+        jobs.append((q.get('body', ''), QUESTION_CHARS))
+        jobs.append((answer, ANSWER_CHARS))
+    texts = convert_many(jobs, pool=converter)
+    examples = [{'id': q['question_id'], 'title': q['title'], 'question': texts[2 * i], 'answer': texts[2 * i + 1], 'votes': q['score'], 'tags': q['tags']}
+                for i, (q, _) in enumerate(pairs)]
+    # An answer with no text (e.g. only an image) is no use as a training example
+    kept = [e for e in examples if e['answer']]
+    metrics.inc('collect_examples_skipped_total', len(examples) - len(kept), reason='empty_answer')
+    return kept
+
+def collect_page(client, page, pagesize):
+    """One questions page plus one batched answer lookup for all of its ids"""
+    data = client.fetch_questions_page(page, pagesize)
+    questions = data.get('items', [])
+    answers = client.fetch_top_answers(q['question_id'] for q in questions) if questions else {}
+    pairs = [(q, answers[q['question_id']]) for q in questions if q['question_id'] in answers]
+    return pairs, bool(data.get('has_more')) and bool(questions)
+
+def load_checkpoint(path):
+    """Checkpoint of a previous run, or None if there is none"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_checkpoint(path, settings, completed, last_page, partial):
+    """partial maps a page that was cut at `limit` to how many of its examples were taken"""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'settings': settings, 'completed_pages': sorted(completed), 'last_page': last_page,
+                   'partial_pages': {str(p): n for p, n in sorted(partial.items())}}, f)
+    os.replace(tmp, path)
+
+def resume_state(output, checkpoint_path, settings):
+    """(completed pages, last page, partial pages) to resume from; never deletes existing output
+
+    Existing output without a matching checkpoint is refused rather than
+    overwritten: the caller has to pass --fresh (or pick another --output).
+    """
+    checkpoint = load_checkpoint(checkpoint_path)
+    matches = checkpoint is not None and checkpoint.get('settings') == settings
+    if not matches and os.path.exists(output) and os.path.getsize(output):
+        reason = 'has no checkpoint' if checkpoint is None else f"was collected with {checkpoint.get('settings')}"
+        raise ResumeRefused(f"{output} {reason}; pass --fresh to overwrite it or choose another --output")
+    if not matches:
+        return set(), None, {}
+    partial = {int(p): n for p, n in checkpoint.get('partial_pages', {}).items()}
+    return set(checkpoint['completed_pages']), checkpoint.get('last_page'), partial
+
+def load_seen_ids(path):
+    """Ids already written to the JSONL output (guards against a crash between write and checkpoint)"""
+    seen = set()
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    seen.add(json.loads(line)['id'])
+    return seen
+
+def collect(client, output, checkpoint_path, limit, pagesize=100, workers=4, raw_output=None):
+    """Collect up to `limit` questions page by page, appending to JSONL and checkpointing each page
+
+    Pages are fetched concurrently in a sliding window; the run stops at the
+    last page (has_more == false), at `limit`, or when the quota runs out, and
+    a later run with the same settings (or a larger limit) resumes from the checkpoint.
+    A page whose request fails after retries is left pending for that later run;
+    a page cut at `limit` is recorded as partial and only refetched for a larger limit.
+    """
+    pages = -(-limit // pagesize)
+    settings = {'api_url': client.api_url, 'pagesize': pagesize}
+    completed, last_page, partial = resume_state(output, checkpoint_path, settings)
+    seen = load_seen_ids(output)
+    pages = min(pages, last_page or pages)
+    # Pages cut at a previous limit are only refetched when the limit has grown past what is on disk
+    todo = iter([] if len(seen) >= limit else [p for p in range(1, pages + 1) if p not in completed])
+    failed = []
+    written = 0
+
+    raw = open(raw_output, 'a', encoding='utf-8') if raw_output else None
+    with open(output, 'a', encoding='utf-8') as out, ThreadPoolExecutor(max_workers=workers) as pool, ProcessPoolExecutor() as converter:
+        running = {}
+        for page in todo:
+            running[pool.submit(collect_page, client, page, pagesize)] = page
+            if len(running) >= workers * 2:
+                break
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                page = running.pop(future)
+                try:
+                    pairs, has_more = future.result()
+                except QuotaExhausted:
+                    print(f"  [WARN] API quota exhausted at page {page}, resume later to continue")
+                    todo = iter([])
+                    continue
+                except (RequestFailed, requests.RequestException) as e:
+                    # Not completed and not the last page: the next run retries it
+                    print(f"  [WARN] Page {page} failed ({e}), left pending")
+                    metrics.inc('collect_pages_failed_total')
+                    failed.append(page)
+                    continue
+                batch = build_examples(pairs, converter)
+                if raw:
+                    for q, answer in pairs:
+                        raw.write(json.dumps({'id': q['question_id'], 'body': q.get('body', ''), 'answer_body': answer}, ensure_ascii=False) + '\n')
+                taken = 0
+                for example in batch:
+                    if example['id'] not in seen:
+                        if len(seen) >= limit:
+                            break
+                        seen.add(example['id'])
+                        out.write(json.dumps(example, ensure_ascii=False) + '\n')
+                        written += 1
+                    taken += 1
+                out.flush()
+                metrics.inc('collect_pages_total')
+                if taken < len(batch):
+                    partial[page] = taken
+                else:
+                    completed.add(page)
+                    partial.pop(page, None)
+                if not has_more:
+                    last_page = min(page, last_page or page)
+                    todo = iter([])
+                save_checkpoint(checkpoint_path, settings, completed, last_page, partial)
+                print(f"  Page {page}/{pages}: {len(batch)} examples")
+                for next_page in todo:
+                    running[pool.submit(collect_page, client, next_page, pagesize)] = next_page
+                    break
+
+    if raw:
+        raw.close()
+    if failed:
+        print(f"  [WARN] {len(failed)} page(s) failed and stay pending: {sorted(failed)}; rerun to retry them")
+    return written, len(seen)
+
+def jsonl_to_json(source, destination):
+    """Stream JSONL records into the JSON array format the later stages read"""
+    with open(source, 'r', encoding='utf-8') as src, open(destination, 'w', encoding='utf-8') as dst:
+        dst.write('[')
+        first = True
+        for line in src:
+            if not line.strip():
+                continue
+            dst.write('\n  ' if first else ',\n  ')
+            dst.write(line.strip())
+            first = False
+        dst.write('\n]\n' if not first else ']\n')
 
 def main():
+    parser = argparse.ArgumentParser(description='Collect Excel Q&A examples from StackOverflow')
+    parser.add_argument('--limit', type=int, default=50, help='questions to collect (any size, paginated)')
+    parser.add_argument('--pagesize', type=int, default=100, help='questions per page (max 100)')
+    parser.add_argument('--workers', type=int, default=4, help='concurrent page fetches')
+    parser.add_argument('--rate', type=float, default=10, help='max requests per second')
+    parser.add_argument('--key', help='StackExchange API key (raises the daily quota)')
+    parser.add_argument('--api-url', default=API_URL, help='API base URL (e.g. a local stub server)')
+    parser.add_argument('--output', default='training-data/excel/stackoverflow_examples.jsonl')
+    parser.add_argument('--json-output', default='training-data/excel/stackoverflow_examples.json',
+                        help="JSON array copy for the later pipeline stages ('' to skip)")
+    parser.add_argument('--cache-dir', default='training-data/.cache/stackexchange', help="response cache ('' to disable)")
+    parser.add_argument('--cache-ttl', type=float, default=24, help='response cache expiry in hours')
+    parser.add_argument('--raw-output', help='also append raw HTML bodies to this JSONL (input for html_to_text.py --benchmark)')
+    parser.add_argument('--fresh', action='store_true', help='delete the existing output and checkpoint and start over')
+    args = parser.parse_args()
+
+    output = Path(args.output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint = f"{output}.checkpoint"
+    if args.fresh:
+        for path in (checkpoint, str(output)):
+            if os.path.exists(path):
+                os.remove(path)
+
     print("Fetching Excel Q&A from StackOverflow...")
-    questions = fetch_excel_questions(50)
-    examples = []
-    for i, q in enumerate(questions[:50]):
-        print(f"{i+1}/50: {q['title'][:50]}...")
-        answer = fetch_answers(q['question_id'])
-        if answer:
-            examples.append({'id': q['question_id'], 'title': q['title'], 'question': clean_html(q.get('body', ''))[:500], 'answer': clean_html(answer)[:1000], 'votes': q['score'], 'tags': q['tags']})
-            print(f"  [OK] Added")
-        time.sleep(0.5)
-
-    Path('training-data/excel').mkdir(parents=True, exist_ok=True)
-    with open('training-data/excel/stackoverflow_examples.json', 'w', encoding='utf-8') as f:
-        json.dump(examples, f, indent=2)
-    print(f"\n[OK] Saved {len(examples)} examples")
+    cache = ResponseCache(args.cache_dir, args.cache_ttl * 3600) if args.cache_dir else None
+    client = StackExchangeClient(args.api_url, rate=args.rate, key=args.key, pool_size=max(args.workers, 2), cache=cache)
+    start = time.perf_counter()
+    try:
+        written, total = collect(client, str(output), checkpoint, args.limit, min(args.pagesize, 100), args.workers, args.raw_output)
+    except ResumeRefused as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+    elapsed = time.perf_counter() - start
+    metrics.inc('collect_examples_written_total', written)
+    metrics.set('collect_examples', total)
+    metrics.observe('collect_seconds', elapsed)
+    if client.quota_remaining is not None:
+        metrics.set('collect_api_quota_remaining', client.quota_remaining)
+
+    if args.json_output:
+        jsonl_to_json(output, args.json_output)
+    cache_hits = cache.hits if cache else 0
+    print(f"\n[OK] Added {written} examples, {total} total in {output} ({client.requests_made} requests, {cache_hits} cache hits, {elapsed:.1f}s, quota remaining: {client.quota_remaining})")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+SQLite-backed training corpus store
+Indexed columns (source, type, votes, tags), an FTS5 index over question
+and answer text, bulk upsert by id, and import/export to the JSON formats
+used by the pipeline scripts
+"""
+import argparse
+import json
+import sqlite3
+
+DEFAULT_DB = 'training-data/corpus.db'
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS examples (
+    source    TEXT NOT NULL,
+    id        TEXT NOT NULL,
+    type      TEXT,
+    operation TEXT,
+    votes     INTEGER,
+    title     TEXT,
+    question  TEXT,
+    answer    TEXT,
+    record    TEXT NOT NULL,
+    PRIMARY KEY (source, id)
+);
+CREATE INDEX IF NOT EXISTS idx_examples_source_votes ON examples (source, votes DESC);
+CREATE INDEX IF NOT EXISTS idx_examples_type ON examples (type, operation);
+
+CREATE TABLE IF NOT EXISTS example_tags (
+    tag    TEXT NOT NULL,
+    source TEXT NOT NULL,
+    id     TEXT NOT NULL,
+    PRIMARY KEY (tag, source, id)
+) WITHOUT ROWID;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS examples_fts USING fts5(
+    title, question, answer, content='examples', content_rowid='rowid'
+);
+CREATE TRIGGER IF NOT EXISTS examples_ai AFTER INSERT ON examples BEGIN
+    INSERT INTO examples_fts (rowid, title, question, answer) VALUES (new.rowid, new.title, new.question, new.answer);
+END;
+CREATE TRIGGER IF NOT EXISTS examples_ad AFTER DELETE ON examples BEGIN
+    INSERT INTO examples_fts (examples_fts, rowid, title, question, answer) VALUES ('delete', old.rowid, old.title, old.question, old.answer);
+END;
+CREATE TRIGGER IF NOT EXISTS examples_au AFTER UPDATE ON examples BEGIN
+    INSERT INTO examples_fts (examples_fts, rowid, title, question, answer) VALUES ('delete', old.rowid, old.title, old.question, old.answer);
+    INSERT INTO examples_fts (rowid, title, question, answer) VALUES (new.rowid, new.title, new.question, new.answer);
+END;
+
+CREATE TABLE IF NOT EXISTS documents (
+    name    TEXT PRIMARY KEY,
+    content TEXT NOT NULL
+);
+"""
+
+UPSERT = """
+INSERT INTO examples (source, id, type, operation, votes, title, question, answer, record)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (source, id) DO UPDATE SET
+    type = excluded.type, operation = excluded.operation, votes = excluded.votes, title = excluded.title,
+    question = excluded.question, answer = excluded.answer, record = excluded.record
+"""
+
+class CorpusStore:
+    """Local corpus database; use as a context manager or call close()"""
+    def __init__(self, path=DEFAULT_DB):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            raise RuntimeError(f"Unsupported corpus schema version {version} in {path}")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def upsert(self, records, source, batch_size=5000):
+        """Insert or replace records by (source, id) in batched transactions; returns the count"""
+        total = 0
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                total += self._upsert_batch(batch, source)
+                batch = []
+        if batch:
+            total += self._upsert_batch(batch, source)
+        return total
+
+    def _upsert_batch(self, records, source):
+        rows = []
+        tags = []
+        ids = []
+        for r in records:
+            rid = str(r['id'])
+            ids.append((source, rid))
+            rows.append((source, rid, r.get('type'), r.get('operation', r.get('formula')), r.get('votes'),
+                         r.get('title'), r.get('question'), r.get('answer'), json.dumps(r, ensure_ascii=False)))
+            tags.extend((tag, source, rid) for tag in r.get('tags', []))
+        with self.conn:
+            self.conn.executemany(UPSERT, rows)
+            self.conn.executemany('DELETE FROM example_tags WHERE source = ? AND id = ?', ids)
+            self.conn.executemany('INSERT OR IGNORE INTO example_tags (tag, source, id) VALUES (?, ?, ?)', tags)
+        return len(rows)
+
+    def query(self, source=None, type=None, tag=None, min_votes=None, text=None, order='votes', limit=None):
+        """Stream matching records (original JSON) filtered on indexed columns and/or full text"""
+        sql = ['SELECT e.record FROM examples e']
+        where = []
+        params = []
+        if text:
+            sql.append('JOIN examples_fts f ON f.rowid = e.rowid')
+            where.append('examples_fts MATCH ?')
+            params.append(text)
+        if tag:
+            where.append('EXISTS (SELECT 1 FROM example_tags t WHERE t.tag = ? AND t.source = e.source AND t.id = e.id)')
+            params.append(tag)
+        for column, value in (('e.source', source), ('e.type', type)):
+            if value is not None:
+                where.append(f'{column} = ?')
+                params.append(value)
+        if min_votes is not None:
+            where.append('e.votes >= ?')
+            params.append(min_votes)
+        if where:
+            sql.append('WHERE ' + ' AND '.join(where))
+        if order == 'votes':
+            sql.append('ORDER BY e.votes DESC')
+        elif order == 'rank' and text:
+            sql.append('ORDER BY bm25(examples_fts)')
+        if limit:
+            sql.append('LIMIT ?')
+            params.append(limit)
+        for (record,) in self.conn.execute(' '.join(sql), params):
+            yield json.loads(record)
+
+    def count(self, source=None):
+        if source is None:
+            return self.conn.execute('SELECT COUNT(*) FROM examples').fetchone()[0]
+        return self.conn.execute('SELECT COUNT(*) FROM examples WHERE source = ?', (source,)).fetchone()[0]
+
+    def put_document(self, name, content):
+        """Store a derived JSON document (e.g. the best_examples selection)"""
+        with self.conn:
+            self.conn.execute('INSERT OR REPLACE INTO documents (name, content) VALUES (?, ?)',
+                              (name, json.dumps(content, ensure_ascii=False)))
+
+    def get_document(self, name):
+        row = self.conn.execute('SELECT content FROM documents WHERE name = ?', (name,)).fetchone()
+        if row is None:
+            raise KeyError(f"No document named {name!r} in the corpus store")
+        return json.loads(row[0])
+
+def export_json(records, path):
+    """Stream records into the JSON array format of the existing *_examples.json files"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for record in records:
+            f.write(',\n  ' if count else '\n  ')
+            f.write(json.dumps(record, ensure_ascii=False))
+            count += 1
+        f.write('\n]\n' if count else ']\n')
+    return count
+
+def main():
+    from select_best_examples import iter_examples
+
+    parser = argparse.ArgumentParser(description='Local SQLite corpus store for training examples')
+    parser.add_argument('--db', default=DEFAULT_DB, help='database path')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    imp = commands.add_parser('import', help='bulk upsert JSON/JSONL files or shard directories')
+    imp.add_argument('--source', required=True, choices=['stackoverflow', 'synthetic'])
+    imp.add_argument('paths', nargs='+')
+
+    for name in ('query', 'export'):
+        cmd = commands.add_parser(name, help=f'{name} examples')
+        cmd.add_argument('--source')
+        cmd.add_argument('--type')
+        cmd.add_argument('--tag')
+        cmd.add_argument('--min-votes', type=int)
+        cmd.add_argument('--text', help='FTS5 match expression over title/question/answer')
+        cmd.add_argument('--limit', type=int)
+        if name == 'export':
+            cmd.add_argument('output', help='JSON array file to write')
+
+    args = parser.parse_args()
+
+    with CorpusStore(args.db) as store:
+        if args.command == 'import':
+            count = store.upsert(iter_examples(args.paths), args.source)
+            print(f"[OK] Upserted {count} {args.source} examples ({store.count()} total in {args.db})")
+            return
+
+        records = store.query(args.source, args.type, args.tag, args.min_votes, args.text,
+                              order='rank' if args.text else 'votes', limit=args.limit)
+        if args.command == 'export':
+            print(f"[OK] Exported {export_json(records, args.output)} examples to {args.output}")
+            return
+        for record in records:
+            print(f"  [{record.get('votes', '-')}] {record['id']}: {record.get('title') or record.get('question')}")
+
+if __name__ == '__main__':
+    main()
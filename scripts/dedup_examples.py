@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for the collected Excel Q&A corpus
+MinHash signatures + LSH banding cluster paraphrased questions in roughly
+linear time; the best-voted record of each cluster is kept as representative
+"""
+import argparse, json, re, sys, time, zlib
+from pathlib import Path
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend' / 'scripts'))
+from telemetry import registry
+
+metrics = registry()
+
+NUM_PERM = 128
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64((1 << 32) - 1)
+TOKEN = re.compile(r'[a-z0-9_]+|[=<>:$!]+')
+
+def iter_json_array(f, chunk_size=1 << 16):
+    """Elements of a JSON array decoded one at a time, so memory is bounded by the largest element"""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+    expect_value = None  # None before '[', True after '[' or ',', False after a value
+    while True:
+        while pos < len(buf) and buf[pos].isspace():
+            pos += 1
+        if pos == len(buf):
+            if eof:
+                raise ValueError('unterminated JSON array')
+            buf, pos = f.read(chunk_size), 0
+            eof = not buf
+            continue
+        char = buf[pos]
+        if expect_value is None:
+            if char != '[':
+                raise ValueError('expected a JSON array')
+            pos, expect_value = pos + 1, True
+        elif char == ']':
+            return
+        elif not expect_value:
+            if char != ',':
+                raise ValueError(f"expected ',' or ']' in JSON array, found {char!r}")
+            pos, expect_value = pos + 1, True
+        else:
+            # A value running to the end of the buffer may continue in the next chunk
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+                complete = end < len(buf) or eof
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                complete = False
+            if not complete:
+                chunk = f.read(chunk_size)
+                buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+                continue
+            yield value
+            pos, expect_value = end, False
+
+def iter_records(path):
+    """Records from a JSON array or JSONL file (both are streamed)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first == '[':
+            yield from iter_json_array(f)
+            return
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def record_text(record):
+    return ' '.join(str(record.get(k, '')) for k in ('title', 'question', 'answer'))
+
+def shingles(text, size=3):
+    """Hashed word n-grams of the normalized text"""
+    tokens = TOKEN.findall(text.lower())
+    if len(tokens) < size:
+        tokens = tokens + [''] * (size - len(tokens))
+    grams = {' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+    return np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams), dtype=np.uint64, count=len(grams))
+
+class MinHasher:
+    """Fixed random permutations (seeded, so signatures are stable across runs)"""
+    def __init__(self, num_perm=NUM_PERM, seed=1):
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)[:, None]
+        self.b = rng.randint(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)[:, None]
+
+    def signature(self, hashes):
+        with np.errstate(over='ignore'):
+            permuted = (self.a * hashes[None, :] + self.b) % MERSENNE_PRIME & MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+def choose_bands(threshold, num_perm=NUM_PERM):
+    """Band/row split whose S-curve threshold (1/b)^(1/r) is closest to `threshold`"""
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    return min(options, key=lambda br: abs((1 / br[0]) ** (1 / br[1]) - threshold))
+
+class UnionFind:
+    def __init__(self):
+        self.parent = []
+
+    def add(self):
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def find(self, x):
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, x, y):
+        rx, ry = self.find(x), self.find(y)
+        if rx != ry:
+            self.parent[max(rx, ry)] = min(rx, ry)
+
+def rank_key(record):
+    """Higher is better: votes, then answer length"""
+    return (record.get('votes', 0), len(record.get('answer', '')))
+
+def cluster(records, threshold=0.7, num_perm=NUM_PERM, seed=1):
+    """Cluster near-duplicate records; returns (cluster root per record, stats)
+
+    Each record is hashed once and bucketed per LSH band; records sharing a
+    bucket are merged when their estimated Jaccard similarity passes the
+    threshold, so no pairwise comparison over the whole corpus is needed.
+    """
+    hasher = MinHasher(num_perm, seed)
+    bands, rows = choose_bands(threshold, num_perm)
+    buckets = [dict() for _ in range(bands)]
+    signatures = []
+    uf = UnionFind()
+    compared = 0
+
+    for record in records:
+        sig = hasher.signature(shingles(record_text(record)))
+        idx = uf.add()
+        signatures.append(sig)
+        for band in range(bands):
+            key = sig[band * rows:(band + 1) * rows].tobytes()
+            other = buckets[band].setdefault(key, idx)
+            if other != idx and uf.find(other) != uf.find(idx):
+                compared += 1
+                if np.count_nonzero(signatures[other] == sig) / num_perm >= threshold:
+                    uf.union(other, idx)
+
+    roots = [uf.find(i) for i in range(len(signatures))]
+    return roots, {'bands': bands, 'rows': rows, 'candidate_pairs': compared}
+
+def dedup(records, threshold=0.7):
+    """Keep the best record per near-duplicate cluster, annotated with cluster_size"""
+    records = list(records)
+    roots, _ = cluster(records, threshold)
+    best = {}
+    sizes = {}
+    for record, root in zip(records, roots):
+        sizes[root] = sizes.get(root, 0) + 1
+        if root not in best or rank_key(record) > rank_key(best[root]):
+            best[root] = record
+    return [dict(record, cluster_size=sizes[root]) for root, record in best.items()]
+
+def main():
+    parser = argparse.ArgumentParser(description='Near-duplicate clustering of Q&A examples (MinHash-LSH)')
+    parser.add_argument('input', nargs='?', default='training-data/excel/stackoverflow_examples.jsonl')
+    parser.add_argument('--output', default='training-data/excel/stackoverflow_dedup.jsonl')
+    parser.add_argument('--clusters', help='write cluster membership (JSON) to this path')
+    parser.add_argument('--threshold', type=float, default=0.7, help='Jaccard similarity for near-duplicates')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Near-Duplicate Detection (MinHash-LSH)")
+    print("=" * 60)
+
+    # First pass keeps only what ranking needs; records are re-read for output
+    start = time.perf_counter()
+    ranks = []
+    ids = []
+    def light(path):
+        for record in iter_records(path):
+            ranks.append(rank_key(record))
+            ids.append(record.get('id'))
+            yield record
+    roots, stats = cluster(light(args.input), args.threshold)
+    elapsed = time.perf_counter() - start
+
+    members = {}
+    for i, root in enumerate(roots):
+        members.setdefault(root, []).append(i)
+    keep = {max(group, key=lambda i: ranks[i]): len(group) for group in members.values()}
+
+    with open(args.output, 'w', encoding='utf-8') as out:
+        for i, record in enumerate(iter_records(args.input)):
+            if i in keep:
+                out.write(json.dumps(dict(record, cluster_size=keep[i]), ensure_ascii=False) + '\n')
+
+    if args.clusters:
+        with open(args.clusters, 'w', encoding='utf-8') as f:
+            json.dump([{'representative': ids[max(g, key=lambda i: ranks[i])], 'size': len(g), 'members': [ids[i] for i in g]}
+                       for g in sorted(members.values(), key=len, reverse=True) if len(g) > 1], f, indent=2)
+
+    duplicate_clusters = [g for g in members.values() if len(g) > 1]
+    metrics.inc('dedup_records_total', len(roots))
+    metrics.inc('dedup_removed_total', len(roots) - len(members))
+    metrics.inc('dedup_candidate_pairs_total', stats['candidate_pairs'])
+    metrics.observe('dedup_seconds', elapsed)
+    print(f"Records: {len(roots)}")
+    print(f"Clusters: {len(members)} ({len(duplicate_clusters)} with duplicates, largest {max(map(len, members.values()), default=0)})")
+    print(f"Removed: {len(roots) - len(members)} near-duplicates")
+    print(f"LSH: {stats['bands']} bands x {stats['rows']} rows, {stats['candidate_pairs']} candidate pairs checked")
+    print(f"Time: {elapsed:.2f}s ({len(roots) / max(elapsed, 1e-9):.0f} records/s)")
+    print(f"[OK] Saved {len(keep)} representatives to {args.output}")
+
+if __name__ == '__main__':
+    main()
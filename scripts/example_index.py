@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Per-query few-shot retrieval over the selected examples
+Builds a compact BM25 inverted index (question text, formula names,
+operation types) and looks up the 2-3 most relevant examples per request
+"""
+import argparse
+import json
+import math
+import re
+import time
+from generate_enhanced_prompt import TOKENIZERS, count_tokens, render_example, use_tokenizer
+
+INDEX_VERSION = 1
+WORD = re.compile(r'[a-z][a-z0-9]+')
+FORMULA_FUNCTION = re.compile(r'\b([A-Z][A-Z0-9.]{1,})\(')
+
+def tokenize(text):
+    """Lowercased word terms plus fn: terms for formula calls written as NAME("""
+    terms = WORD.findall(text.lower())
+    terms.extend(f"fn:{name.lower()}" for name in FORMULA_FUNCTION.findall(text))
+    return terms
+
+def document_terms(example):
+    """Indexed terms: question (and SO context), formula names, operation/type"""
+    text = ' '.join(str(example.get(k) or '') for k in ('question', 'context', 'formula'))
+    terms = tokenize(text)
+    terms.extend(f"fn:{name.lower()}" for name in FORMULA_FUNCTION.findall(str(example.get('answer', ''))))
+    for key in ('operation', 'type'):
+        value = str(example.get(key) or '').lower()
+        terms.extend(WORD.findall(value.replace('_', ' ').replace('/', ' ')))
+    # A formula name also matches the plain word ("how do I use vlookup")
+    terms.extend(t[3:] for t in list(terms) if t.startswith('fn:'))
+    return terms
+
+def build_index(examples, k1=1.2, b=0.75):
+    """BM25 index with per-posting weights precomputed, so a lookup is only dictionary sums"""
+    docs = [document_terms(ex) for ex in examples]
+    avgdl = sum(map(len, docs)) / max(len(docs), 1)
+    df = {}
+    for terms in docs:
+        for term in set(terms):
+            df[term] = df.get(term, 0) + 1
+
+    postings = {}
+    for doc_id, terms in enumerate(docs):
+        counts = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        norm = k1 * (1 - b + b * len(terms) / avgdl) if avgdl else k1
+        for term, tf in counts.items():
+            idf = math.log(1 + (len(docs) - df[term] + 0.5) / (df[term] + 0.5))
+            postings.setdefault(term, []).append([doc_id, round(idf * tf * (k1 + 1) / (tf + norm), 4)])
+
+    return {'version': INDEX_VERSION, 'k1': k1, 'b': b, 'examples': examples, 'postings': postings}
+
+class ExampleIndex:
+    """Lookup API over a built index"""
+    def __init__(self, data):
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported example index version: {data.get('version')}")
+        self.examples = data['examples']
+        self.postings = data['postings']
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def search(self, query, k=3):
+        """Top-k examples for the query (empty when nothing matches)"""
+        scores = {}
+        for term in set(tokenize(query)):
+            for doc_id, weight in self.postings.get(term, ()):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [self.examples[doc_id] for doc_id, _ in ranked]
+
+def few_shot_block(index, query, k=3):
+    """Prompt text for the examples most relevant to `query`, rendered like the static prompt"""
+    return ''.join(render_example(ex, i) for i, ex in enumerate(index.search(query, k), 1))
+
+def load_selected_examples(path):
+    """Flatten best_examples.json into one list, tagging each example with its source"""
+    with open(path, 'r', encoding='utf-8') as f:
+        best = json.load(f)
+    return [dict(ex, source=source) for source in ('synthetic', 'stackoverflow') for ex in best.get(source, [])]
+
+def main():
+    parser = argparse.ArgumentParser(description='Build / query the few-shot example retrieval index')
+    parser.add_argument('--input', default='training-data/excel/best_examples.json')
+    parser.add_argument('--output', default='training-data/excel/example_index.json')
+    parser.add_argument('--query', action='append', default=[], help='look up examples for a query (repeatable)')
+    parser.add_argument('-k', type=int, default=3, help='examples per query')
+    parser.add_argument('--tokenizer', choices=TOKENIZERS, default='tiktoken', help='token counter for the query report')
+    args = parser.parse_args()
+
+    if not args.query:
+        examples = load_selected_examples(args.input)
+        index = build_index(examples)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(',', ':'), ensure_ascii=False)
+        print(f"[OK] Indexed {len(examples)} examples ({len(index['postings'])} terms) to {args.output}")
+        return
+
+    use_tokenizer(args.tokenizer)
+    index = ExampleIndex.load(args.output)
+    for query in args.query:
+        start = time.perf_counter()
+        for _ in range(1000):
+            results = index.search(query, args.k)
+        elapsed_us = (time.perf_counter() - start) * 1000
+        print(f"\n{query!r} ({elapsed_us:.1f} us/lookup)")
+        for ex in results:
+            print(f"  - [{ex['source']}] {ex['question']}")
+        print(f"  ~{count_tokens(few_shot_block(index, query, args.k))} tokens of examples")
+
+if __name__ == '__main__':
+    main()
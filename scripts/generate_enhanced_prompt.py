@@ -1,18 +1,70 @@
 #!/usr/bin/env python3
 """
 Generate enhanced system prompt with training examples
+Examples are packed into a token budget: each section and example is
+measured locally and examples are chosen greedily for coverage per token
 """
+import argparse
+import hashlib
 import json
+import re
+import sys
+from pathlib import Path
+from corpus_store import CorpusStore
+from select_best_examples import features
 
-def load_best_examples():
-    """Load best examples"""
+TOKEN_PIECE = re.compile(r"\w+|[^\w\s]")
+TOKENIZERS = ('tiktoken', 'estimate')
+
+class TokenizerUnavailable(RuntimeError):
+    """The requested tokenizer cannot be loaded (tiktoken missing or its encoding not downloadable)"""
+
+_tokenizer = None
+
+def estimate_tokens(text):
+    """Word/punctuation estimate: about one token per four characters of each piece"""
+    return sum(-(-len(piece) // 4) for piece in TOKEN_PIECE.findall(text))
+
+def use_tokenizer(name='tiktoken'):
+    """Select the one tokenizer used for budgets, example selection and the manifest; returns its label
+
+    There is deliberately no fallback: the chosen examples depend on the
+    counts, so a missing tiktoken fails here instead of silently changing them.
+    """
+    global _tokenizer
+    if name == 'estimate':
+        _tokenizer = ('estimate', estimate_tokens)
+    elif name == 'tiktoken':
+        try:
+            import tiktoken
+            encoding = tiktoken.get_encoding('cl100k_base')
+        except Exception as e:
+            raise TokenizerUnavailable(f"tiktoken cl100k_base is unavailable ({e}); install it or pass --tokenizer estimate") from e
+        _tokenizer = ('tiktoken:cl100k_base', lambda text: len(encoding.encode(text)))
+    else:
+        raise ValueError(f"unknown tokenizer {name!r}, expected one of {TOKENIZERS}")
+    return _tokenizer[0]
+
+def tokenizer_label():
+    if _tokenizer is None:
+        use_tokenizer()
+    return _tokenizer[0]
+
+def count_tokens(text):
+    """Token count with the selected tokenizer (tiktoken cl100k_base unless use_tokenizer chose otherwise)"""
+    if _tokenizer is None:
+        use_tokenizer()
+    return _tokenizer[1](text)
+
+def load_best_examples(db=None):
+    """Load best examples (from the corpus store when a database is given)"""
+    if db:
+        with CorpusStore(db) as store:
+            return store.get_document('best_examples')
     with open('training-data/excel/best_examples.json', 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def generate_excel_prompt(examples):
-    """Generate Excel-specific system prompt"""
-
-    prompt = """
+EXCEL_HEADER = """
 ## EXCEL ANALYSIS EXPERTISE
 You are an expert at analyzing Excel spreadsheets. Follow these rules:
 
@@ -38,6 +90,11 @@ When data spans multiple sheets:
 ### Examples:
 """
 
+def generate_excel_prompt(examples):
+    """Generate Excel-specific system prompt (unbudgeted: first five synthetic examples)"""
+
+    prompt = EXCEL_HEADER
+
     # Add synthetic examples
     for i, ex in enumerate(examples['synthetic'][:5], 1):
         prompt += f"\n**Example {i}: {ex['question']}**\n"
@@ -51,6 +108,57 @@ When data spans multiple sheets:
 
     return prompt
 
+def render_example(ex, number):
+    """Compact rendering of one example: minified data, one line per reasoning step"""
+    text = f"\n**Example {number}: {ex['question']}**\n"
+    if ex.get('context'):
+        text += f"Context: {ex['context']}\n"
+    if ex.get('data'):
+        text += f"Data: {json.dumps(ex['data'], separators=(',', ':'), ensure_ascii=False)}\n"
+    text += f"Answer: {ex['answer']}\n"
+    if ex.get('reasoning'):
+        text += "Reasoning: " + "; ".join(ex['reasoning']) + "\n"
+    return text
+
+def example_features(ex, source):
+    """Coverage features of an example: source, type/operation, formula functions, question"""
+    found = features(ex)
+    found.add(f"src:{source}")
+    found.add(f"q:{ex['question'].strip().lower()}")
+    return found
+
+def choose_examples(examples, budget):
+    """Greedy weighted max-coverage: repeatedly take the example adding the most new features per token"""
+    candidates = []
+    for source in ('synthetic', 'stackoverflow'):
+        for ex in examples.get(source, []):
+            cost = count_tokens(render_example(ex, 99))
+            candidates.append((ex, example_features(ex, source), cost))
+
+    chosen = []
+    covered = set()
+    spent = 0
+    while True:
+        best = None
+        for i, (ex, feats, cost) in enumerate(candidates):
+            gain = len(feats - covered)
+            if gain and spent + cost <= budget and (best is None or gain / cost > best[0]):
+                best = (gain / cost, i)
+        if best is None:
+            break
+        ex, feats, cost = candidates.pop(best[1])
+        chosen.append(ex)
+        covered |= feats
+        spent += cost
+    return chosen
+
+def generate_budgeted_excel_prompt(examples, budget):
+    """Excel section whose examples fit in `budget` tokens (header included)"""
+    prompt = EXCEL_HEADER
+    for i, ex in enumerate(choose_examples(examples, budget - count_tokens(prompt)), 1):
+        prompt += render_example(ex, i)
+    return prompt
+
 def generate_pdf_prompt():
     """Generate PDF-specific system prompt"""
 
@@ -101,7 +209,85 @@ Always enhance your responses with:
 - **Short answer**: For simple facts (1-2 sentences)
 """
 
+ARTIFACT_SCHEMA = 1
+INTENTS = ('excel', 'pdf', 'general')
+
+def normalize(text):
+    """Byte-stable form of a prompt part: LF line endings, no trailing spaces, one final newline"""
+    lines = [line.rstrip() for line in text.replace('\r\n', '\n').split('\n')]
+    return '\n'.join(lines).strip('\n') + '\n' if any(lines) else ''
+
+def sha256(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def write_if_changed(path, text):
+    """Write only when the bytes differ, so unchanged artifacts keep their mtime; returns True if written"""
+    data = text.encode('utf-8')
+    if path.exists() and path.read_bytes() == data:
+        return False
+    path.write_bytes(data)
+    return True
+
+def write_artifacts(out_dir, prefix, suffixes):
+    """Shared prefix + per-intent suffixes + manifest with content hashes
+
+    The prefix holds only static guidance, so it stays byte-identical across
+    regenerations and deploys (keeping provider-side prefix caches warm);
+    anything data-dependent lives in the intent suffixes.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    parts = {'prefix': normalize(prefix)}
+    parts.update({f'intent-{name}': normalize(suffixes[name]) for name in INTENTS})
+
+    artifacts = {}
+    changed = []
+    for name, text in parts.items():
+        path = out_dir / f'{name}.txt'
+        if write_if_changed(path, text):
+            changed.append(path.name)
+        artifacts[name] = {'file': path.name, 'sha256': sha256(text), 'bytes': len(text.encode('utf-8')), 'tokens': count_tokens(text)}
+
+    intents = {}
+    for name in INTENTS:
+        suffix = f'intent-{name}'
+        intents[name] = {
+            'parts': ['prefix', suffix],
+            'sha256': sha256(parts['prefix'] + parts[suffix]),
+            'tokens': artifacts['prefix']['tokens'] + artifacts[suffix]['tokens']
+        }
+
+    manifest = {
+        'schema': ARTIFACT_SCHEMA,
+        'version': sha256(''.join(a['sha256'] for _, a in sorted(artifacts.items())))[:12],
+        'prefix_version': artifacts['prefix']['sha256'][:12],
+        'tokenizer': tokenizer_label(),
+        'artifacts': artifacts,
+        'intents': intents
+    }
+    if write_if_changed(out_dir / 'manifest.json', json.dumps(manifest, indent=2, sort_keys=True) + '\n'):
+        changed.append('manifest.json')
+    return manifest, changed
+
 def main():
+    parser = argparse.ArgumentParser(description='Generate enhanced system prompt')
+    parser.add_argument('--budget', type=int, default=1200, help='token budget for the whole prompt')
+    parser.add_argument('--output', default='training-data/enhanced_system_prompt.txt')
+    parser.add_argument('--artifacts-dir', default='training-data/prompts',
+                        help="write prefix/intent artifacts and manifest here ('' to skip)")
+    parser.add_argument('--db', help='load the selected examples from this corpus store')
+    parser.add_argument('--no-examples', action='store_true',
+                        help='leave examples out of the static prompt (served per query from example_index.py)')
+    parser.add_argument('--tokenizer', choices=TOKENIZERS, default='tiktoken',
+                        help='token counter for budgets and example selection (recorded in the manifest)')
+    args = parser.parse_args()
+
+    try:
+        use_tokenizer(args.tokenizer)
+    except TokenizerUnavailable as e:
+        print(f"[ERROR] {e}")
+        sys.exit(1)
+
     print("=" * 60)
     print("Enhanced System Prompt Generator")
     print("=" * 60)
@@ -109,25 +295,45 @@ def main():
 
     # Load examples
     print("Loading best examples...")
-    examples = load_best_examples()
+    examples = load_best_examples(args.db)
 
     # Generate prompts
-    print("Generating enhanced prompts...")
-    excel_prompt = generate_excel_prompt(examples)
+    print(f"Generating enhanced prompts (budget {args.budget} tokens)...")
     pdf_prompt = generate_pdf_prompt()
     general_prompt = generate_general_prompt()
+    fixed_tokens = count_tokens(general_prompt + "\n" + "\n" + pdf_prompt)
+    excel_budget = count_tokens(EXCEL_HEADER) if args.no_examples else args.budget - fixed_tokens
+    excel_prompt = generate_budgeted_excel_prompt(examples, excel_budget)
 
     # Combine
     full_prompt = general_prompt + "\n" + excel_prompt + "\n" + pdf_prompt
+    legacy_prompt = general_prompt + "\n" + generate_excel_prompt(examples) + "\n" + pdf_prompt
 
     # Save
-    output_file = 'training-data/enhanced_system_prompt.txt'
+    output_file = args.output
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(full_prompt)
 
+    if args.artifacts_dir:
+        manifest, changed = write_artifacts(args.artifacts_dir, general_prompt,
+                                            {'excel': excel_prompt, 'pdf': pdf_prompt, 'general': ''})
+        print(f"[OK] Prompt artifacts v{manifest['version']} (prefix {manifest['prefix_version']}) in {args.artifacts_dir}: "
+              f"{', '.join(changed) if changed else 'unchanged'}")
+
     print(f"[OK] Generated enhanced system prompt ({len(full_prompt)} characters)")
     print(f"[OK] Saved to {output_file}")
 
+    print("\n" + "=" * 60)
+    print(f"Token usage ({tokenizer_label()})")
+    print("=" * 60)
+    for name, section in (('General', general_prompt), ('Excel', excel_prompt), ('PDF', pdf_prompt)):
+        print(f"  {name:<10} {count_tokens(section):>6} tokens")
+    before, after = count_tokens(legacy_prompt), count_tokens(full_prompt)
+    print(f"  {'-'*24}")
+    print(f"  Before:    {before:>6} tokens (first five synthetic examples, indented JSON)")
+    print(f"  After:     {after:>6} tokens ({excel_prompt.count('**Example ')} examples, budget {args.budget})")
+    print(f"  Saved:     {before - after:>6} tokens ({(before - after) / max(before, 1) * 100:.0f}%)")
+
     print("\n" + "=" * 60)
     print("Preview (first 500 characters)")
     print("=" * 60)
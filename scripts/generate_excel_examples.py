@@ -1,22 +1,34 @@
 #!/usr/bin/env python3
 """
 Generate synthetic Excel Q&A examples
+Large runs use the vectorized batch generators (NumPy, explicit seed) and
+write sharded JSONL across worker processes
 """
+import argparse
 import json
+import os
 import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-def generate_sum_example():
-    """Generate SUM formula example"""
-    values = [random.randint(100, 1000) for _ in range(4)]
-    total = sum(values)
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend' / 'scripts'))
+from telemetry import registry
+
+metrics = registry()
 
+def format_sum_example(values, total):
+    """SUM example from its cell values and their total"""
+    a, b, c, d = values
     return {
         'type': 'formula',
         'formula': '=SUM(A1:A4)',
-        'data': {'A1': values[0], 'A2': values[1], 'A3': values[2], 'A4': values[3]},
+        'data': {'A1': a, 'A2': b, 'A3': c, 'A4': d},
         'question': 'What is the total?',
-        'answer': f'The total is ${total:,}, calculated by summing cells A1 through A4 ({values[0]} + {values[1]} + {values[2]} + {values[3]} = {total}).',
+        'answer': f'The total is ${total:,}, calculated by summing cells A1 through A4 ({a} + {b} + {c} + {d} = {total}).',
         'reasoning': [
             'Identify the SUM formula',
             'Sum all values in range A1:A4',
@@ -24,30 +36,23 @@ def generate_sum_example():
         ]
     }
 
-def generate_average_example():
-    """Generate AVERAGE calculation example"""
-    values = [random.randint(50, 200) for _ in range(5)]
-    avg = sum(values) / len(values)
-
+def format_average_example(values, total, avg):
+    """AVERAGE example from the sales values, their sum and mean"""
     return {
         'type': 'aggregation',
         'operation': 'AVERAGE',
         'data': {'Sales': values},
         'question': 'What is the average sales?',
-        'answer': f'The average sales is ${avg:,.2f}, calculated by dividing the total sales of ${sum(values):,} by {len(values)} periods.',
+        'answer': f'The average sales is ${avg:,.2f}, calculated by dividing the total sales of ${total:,} by {len(values)} periods.',
         'reasoning': [
             'Sum all sales values',
             'Divide by count of periods',
-            f'Calculate: {sum(values)} / {len(values)} = {avg:.2f}'
+            f'Calculate: {total} / {len(values)} = {avg:.2f}'
         ]
     }
 
-def generate_growth_example():
-    """Generate growth rate calculation example"""
-    start = random.randint(1000, 5000)
-    end = int(start * random.uniform(1.1, 1.5))
-    growth = ((end - start) / start) * 100
-
+def format_growth_example(start, end, growth):
+    """Growth-rate example from the 2023/2024 values and the growth in percent"""
     return {
         'type': 'calculation',
         'operation': 'GROWTH_RATE',
@@ -62,19 +67,14 @@ def generate_growth_example():
         ]
     }
 
-def generate_comparison_example():
-    """Generate comparison example"""
-    products = ['Widget', 'Gadget', 'Doohickey']
-    sales = {p: random.randint(1000, 5000) for p in products}
-    best = max(sales, key=sales.get)
-    worst = min(sales, key=sales.get)
-
+def format_comparison_example(sales, best, second, worst):
+    """Comparison example from product -> sales and the best, second and worst product"""
     return {
         'type': 'comparison',
         'operation': 'MAX/MIN',
         'data': sales,
         'question': 'Which product has the highest sales?',
-        'answer': f'{best} has the highest sales at ${sales[best]:,}, followed by {sorted(sales.items(), key=lambda x: x[1], reverse=True)[1][0]} at ${sorted(sales.items(), key=lambda x: x[1], reverse=True)[1][1]:,}. {worst} has the lowest at ${sales[worst]:,}.',
+        'answer': f'{best} has the highest sales at ${sales[best]:,}, followed by {second} at ${sales[second]:,}. {worst} has the lowest at ${sales[worst]:,}.',
         'reasoning': [
             'Compare all product sales',
             f'Identify maximum: {best} = ${sales[best]:,}',
@@ -83,13 +83,8 @@ def generate_comparison_example():
         ]
     }
 
-def generate_trend_example():
-    """Generate trend analysis example"""
-    years = [2020, 2021, 2022, 2023]
-    base = random.randint(1000, 3000)
-    growth_rate = random.uniform(1.1, 1.3)
-    values = [int(base * (growth_rate ** i)) for i in range(len(years))]
-
+def format_trend_example(years, values, growth_rate, total_increase):
+    """Trend example from the yearly values, the yearly growth factor and the total increase in percent"""
     trend_type = "accelerating growth" if growth_rate > 1.2 else "steady growth"
 
     return {
@@ -97,7 +92,7 @@ def generate_trend_example():
         'operation': 'TREND',
         'data': dict(zip(years, values)),
         'question': 'What is the trend over time?',
-        'answer': f'The data shows {trend_type} from {years[0]} to {years[-1]}. Revenue increased from ${values[0]:,} to ${values[-1]:,}, representing a {((values[-1]/values[0])-1)*100:.1f}% total increase over the period.',
+        'answer': f'The data shows {trend_type} from {years[0]} to {years[-1]}. Revenue increased from ${values[0]:,} to ${values[-1]:,}, representing a {total_increase:.1f}% total increase over the period.',
         'reasoning': [
             'Calculate year-over-year changes',
             'Identify pattern (accelerating/steady/declining)',
@@ -106,8 +101,42 @@ def generate_trend_example():
         ]
     }
 
-def generate_examples(count=30):
-    """Generate diverse Excel examples"""
+def generate_sum_example(rng=random):
+    """Generate SUM formula example"""
+    values = [rng.randint(100, 1000) for _ in range(4)]
+    return format_sum_example(values, sum(values))
+
+def generate_average_example(rng=random):
+    """Generate AVERAGE calculation example"""
+    values = [rng.randint(50, 200) for _ in range(5)]
+    return format_average_example(values, sum(values), sum(values) / len(values))
+
+def generate_growth_example(rng=random):
+    """Generate growth rate calculation example"""
+    start = rng.randint(1000, 5000)
+    end = int(start * rng.uniform(1.1, 1.5))
+    return format_growth_example(start, end, ((end - start) / start) * 100)
+
+def generate_comparison_example(rng=random):
+    """Generate comparison example"""
+    products = ['Widget', 'Gadget', 'Doohickey']
+    sales = {p: rng.randint(1000, 5000) for p in products}
+    best = max(sales, key=sales.get)
+    worst = min(sales, key=sales.get)
+    second = sorted(sales, key=sales.get, reverse=True)[1]
+    return format_comparison_example(sales, best, second, worst)
+
+def generate_trend_example(rng=random):
+    """Generate trend analysis example"""
+    years = [2020, 2021, 2022, 2023]
+    base = rng.randint(1000, 3000)
+    growth_rate = rng.uniform(1.1, 1.3)
+    values = [int(base * (growth_rate ** i)) for i in range(len(years))]
+    return format_trend_example(years, values, growth_rate, ((values[-1]/values[0])-1)*100)
+
+def generate_examples(count=30, seed=None):
+    """Generate diverse Excel examples (reproducible when seed is given)"""
+    rng = random.Random(seed)
 
     generators = [
         generate_sum_example,
@@ -121,49 +150,155 @@ def generate_examples(count=30):
 
     for i in range(count):
         generator = generators[i % len(generators)]
-        example = generator()
+        example = generator(rng)
         example['id'] = f'synthetic_{i+1}'
         examples.append(example)
 
     return examples
 
+def sum_batch(rng, n):
+    """Vectorized SUM examples"""
+    values = rng.integers(100, 1001, size=(n, 4))
+    totals = values.sum(axis=1)
+    return [format_sum_example(row, total) for row, total in zip(values.tolist(), totals.tolist())]
+
+def average_batch(rng, n):
+    """Vectorized AVERAGE examples"""
+    values = rng.integers(50, 201, size=(n, 5))
+    sums = values.sum(axis=1)
+    avgs = sums / values.shape[1]
+    return [format_average_example(row, total, avg) for row, total, avg in zip(values.tolist(), sums.tolist(), avgs.tolist())]
+
+def growth_batch(rng, n):
+    """Vectorized growth-rate examples"""
+    starts = rng.integers(1000, 5001, size=n)
+    ends = (starts * rng.uniform(1.1, 1.5, size=n)).astype(np.int64)
+    growths = (ends - starts) / starts * 100
+    return [format_growth_example(start, end, growth) for start, end, growth in zip(starts.tolist(), ends.tolist(), growths.tolist())]
+
+def comparison_batch(rng, n):
+    """Vectorized MAX/MIN comparison examples"""
+    products = ['Widget', 'Gadget', 'Doohickey']
+    sales = rng.integers(1000, 5001, size=(n, len(products)))
+    ranking = np.argsort(-sales, axis=1, kind='stable')
+    worst = sales.argmin(axis=1)
+    return [format_comparison_example(dict(zip(products, row)), products[b], products[s], products[w])
+            for row, (b, s, _), w in zip(sales.tolist(), ranking.tolist(), worst.tolist())]
+
+def trend_batch(rng, n):
+    """Vectorized trend examples"""
+    years = [2020, 2021, 2022, 2023]
+    bases = rng.integers(1000, 3001, size=n)
+    rates = rng.uniform(1.1, 1.3, size=n)
+    values = (bases[:, None] * rates[:, None] ** np.arange(len(years))).astype(np.int64)
+    totals = (values[:, -1] / values[:, 0] - 1) * 100
+    return [format_trend_example(years, row, rate, total) for row, rate, total in zip(values.tolist(), rates.tolist(), totals.tolist())]
+
+BATCH_GENERATORS = [sum_batch, average_batch, growth_batch, comparison_batch, trend_batch]
+
+def generate_batch(start, count, seed):
+    """Examples start+1 .. start+count; types cycle like generate_examples, values are vectorized per type"""
+    rng = np.random.default_rng([seed, start])
+    ids = np.arange(start, start + count)
+    examples = [None] * count
+    for t, batch in enumerate(BATCH_GENERATORS):
+        positions = np.nonzero(ids % len(BATCH_GENERATORS) == t)[0]
+        for pos, example in zip(positions.tolist(), batch(rng, len(positions))):
+            example['id'] = f'synthetic_{start + pos + 1}'
+            examples[pos] = example
+    return examples
+
+def write_shard(job):
+    """Worker: generate one shard and write it as JSONL; returns (path, count, type counts)"""
+    path, start, count, seed = job
+    examples = generate_batch(start, count, seed)
+    type_counts = {}
+    with open(path, 'w', encoding='utf-8') as f:
+        for e in examples:
+            type_counts[e['type']] = type_counts.get(e['type'], 0) + 1
+            f.write(json.dumps(e, ensure_ascii=False) + '\n')
+    return path, count, type_counts
+
+def shard_jobs(count, shard_size, seed, output_dir):
+    """Shard boundaries depend only on count/shard_size, so output is identical for any worker count"""
+    jobs = []
+    for i, start in enumerate(range(0, count, shard_size)):
+        path = os.path.join(output_dir, f'synthetic_examples-{i:05d}.jsonl')
+        jobs.append((path, start, min(shard_size, count - start), seed))
+    return jobs
+
+def merge_to_json(paths, destination):
+    """Stream shards into the JSON array read by select_best_examples.py"""
+    with open(destination, 'w', encoding='utf-8') as out:
+        out.write('[')
+        first = True
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    out.write(('\n  ' if first else ',\n  ') + line.strip())
+                    first = False
+        out.write('\n]\n' if not first else ']\n')
+
 def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic Excel Q&A examples')
+    parser.add_argument('--count', type=int, default=30, help='number of examples')
+    parser.add_argument('--seed', type=int, default=42, help='random seed (same seed + count = same output)')
+    parser.add_argument('--shard-size', type=int, default=50000, help='examples per JSONL shard')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes')
+    parser.add_argument('--output-dir', default='training-data/excel/synthetic')
+    parser.add_argument('--json-output', default='training-data/excel/synthetic_examples.json',
+                        help="merged JSON array ('' to skip)")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("Synthetic Excel Example Generator")
     print("=" * 60)
     print()
 
-    # Generate examples
-    print("Generating 30 synthetic examples...")
-    examples = generate_examples(30)
+    print(f"Generating {args.count:,} synthetic examples (seed {args.seed})...")
+    Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+    for stale in Path(args.output_dir).glob('synthetic_examples-*.jsonl'):
+        stale.unlink()
+    jobs = shard_jobs(args.count, args.shard_size, args.seed, args.output_dir)
 
-    # Save to file
-    output_file = 'training-data/excel/synthetic_examples.json'
-    output_path = Path(output_file)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    if len(jobs) > 1 and args.workers != 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(write_shard, jobs))
+    else:
+        results = [write_shard(job) for job in jobs]
+    elapsed = time.perf_counter() - start
+    metrics.inc('generate_examples_total', args.count)
+    metrics.observe('generate_seconds', elapsed)
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(examples, f, indent=2, ensure_ascii=False)
+    if args.json_output:
+        Path(args.json_output).parent.mkdir(parents=True, exist_ok=True)
+        merge_to_json([r[0] for r in results], args.json_output)
+        print(f"[OK] Merged into {args.json_output}")
 
-    print(f"[OK] Saved {len(examples)} examples to {output_file}")
+    print(f"[OK] Saved {args.count:,} examples in {len(results)} shard(s) to {args.output_dir}")
 
     # Print summary
     print("\n" + "=" * 60)
     print("Summary")
     print("=" * 60)
-    print(f"Total examples: {len(examples)}")
+    print(f"Total examples: {args.count:,}")
+    print(f"Throughput: {args.count / max(elapsed, 1e-9):,.0f} examples/sec ({elapsed:.2f}s)")
     print("\nExample types:")
     type_counts = {}
-    for e in examples:
-        t = e['type']
-        type_counts[t] = type_counts.get(t, 0) + 1
+    for _, _, counts in results:
+        for t, count in counts.items():
+            type_counts[t] = type_counts.get(t, 0) + count
 
     for t, count in type_counts.items():
-        print(f"  - {t}: {count}")
+        print(f"  - {t}: {count:,}")
 
-    print("\nSample example:")
-    print(f"  Q: {examples[0]['question']}")
-    print(f"  A: {examples[0]['answer'][:100]}...")
+    if results:
+        with open(results[0][0], 'r', encoding='utf-8') as f:
+            sample = json.loads(f.readline())
+        print("\nSample example:")
+        print(f"  Q: {sample['question']}")
+        print(f"  A: {sample['answer'][:100]}...")
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Generate synthetic .xlsx workbooks for spreadsheet ingestion load tests
+Rows come from the batch example generators and are streamed into
+write-only workbooks with live formulas, a cross-sheet Summary sheet and
+an answers sidecar (expected values) next to each file
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+
+from generate_excel_examples import generate_batch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend' / 'scripts'))
+from telemetry import registry
+
+metrics = registry()
+
+CHUNK_SIZE = 10000
+TOLERANCE = 1e-6
+
+class Layout:
+    """How one example type is laid out: data columns, the per-row formula and its expected value"""
+    def __init__(self, sheet, headers, formula, expected, summary):
+        self.sheet = sheet
+        self.headers = headers
+        self.formula = formula      # (first column letter, last column letter, row) -> formula
+        self.expected = expected    # data values -> expected formula result
+        self.summary = summary      # aggregate used on the Summary sheet over the result column
+
+    @property
+    def result_column(self):
+        return get_column_letter(len(self.headers) + 1)
+
+def row_values(example):
+    data = example['data']
+    return list(data['Sales']) if 'Sales' in data else list(data.values())
+
+LAYOUTS = {
+    'formula': Layout('Sum', ['A1', 'A2', 'A3', 'A4'],
+                      lambda first, last, r: f'=SUM({first}{r}:{last}{r})', sum, 'SUM'),
+    'aggregation': Layout('Average', ['P1', 'P2', 'P3', 'P4', 'P5'],
+                          lambda first, last, r: f'=AVERAGE({first}{r}:{last}{r})',
+                          lambda v: sum(v) / len(v), 'AVERAGE'),
+    'calculation': Layout('Growth', ['2023', '2024'],
+                          lambda first, last, r: f'=({last}{r}-{first}{r})/{first}{r}*100',
+                          lambda v: (v[1] - v[0]) / v[0] * 100, 'AVERAGE'),
+    'comparison': Layout('Comparison', ['Widget', 'Gadget', 'Doohickey'],
+                         lambda first, last, r: f'=MAX({first}{r}:{last}{r})', max, 'MAX'),
+    'trend_analysis': Layout('Trend', ['2020', '2021', '2022', '2023'],
+                             lambda first, last, r: f'=({last}{r}/{first}{r}-1)*100',
+                             lambda v: (v[-1] / v[0] - 1) * 100, 'AVERAGE'),
+}
+
+AGGREGATES = {
+    'SUM': sum,
+    'AVERAGE': lambda values: math.fsum(values) / len(values),
+    'MAX': max,
+}
+
+class SheetGroup:
+    """The sheets of one example type; a new sheet is started every rows_per_sheet rows"""
+    def __init__(self, workbook, layout, rows_per_sheet, samples, stride):
+        self.workbook = workbook
+        self.layout = layout
+        self.rows_per_sheet = rows_per_sheet
+        self.sheets = []            # (title, last data row)
+        self.sheet = None
+        self.row = 0
+        self.results = []
+        self.samples = []
+        self.max_samples = samples
+        self.stride = stride
+
+    def append(self, example):
+        if self.sheet is None or self.row - 1 >= self.rows_per_sheet:
+            title = f"{self.layout.sheet}_{len(self.sheets) + 1}"
+            self.sheet = self.workbook.create_sheet(title)
+            self.sheet.append(self.layout.headers + ['Result'])
+            self.sheets.append([title, 1])
+            self.row = 1
+        self.row += 1
+
+        values = row_values(example)
+        last = get_column_letter(len(values))
+        formula = self.layout.formula('A', last, self.row)
+        self.sheet.append(values + [formula])
+        self.sheets[-1][1] = self.row
+
+        expected = self.layout.expected(values)
+        self.results.append(expected)
+        if (len(self.results) - 1) % self.stride == 0 and len(self.samples) < self.max_samples:
+            self.samples.append({
+                'sheet': self.sheets[-1][0],
+                'cell': f"{self.layout.result_column}{self.row}",
+                'formula': formula,
+                'expected': expected,
+                'question': example['question'],
+                'answer': example['answer']
+            })
+
+    def ranges(self):
+        column = self.layout.result_column
+        return [f"'{title}'!{column}2:{column}{last}" for title, last in self.sheets if last > 1]
+
+def write_workbook(job):
+    """Worker: write one workbook and its answers sidecar; returns (path, rows, sheets, seconds)"""
+    path, rows, seed, rows_per_sheet, samples = job
+    start = time.perf_counter()
+    workbook = Workbook(write_only=True)
+    summary = workbook.create_sheet('Summary')
+    per_type = max(1, rows // len(LAYOUTS))
+    stride = max(1, per_type // max(samples, 1))
+    groups = {t: SheetGroup(workbook, layout, rows_per_sheet, samples, stride) for t, layout in LAYOUTS.items()}
+
+    for offset in range(0, rows, CHUNK_SIZE):
+        for example in generate_batch(offset, min(CHUNK_SIZE, rows - offset), seed):
+            groups[example['type']].append(example)
+
+    # Summary formulas reference every data sheet of a type (cross-sheet ranges)
+    summary.append(['Metric', 'Formula', 'Rows'])
+    checks = []
+    for t, group in groups.items():
+        if not group.results:
+            continue
+        aggregate = group.layout.summary
+        formula = f"={aggregate}({','.join(group.ranges())})"
+        row = len(checks) + 2
+        summary.append([f"{aggregate} of {group.layout.sheet} results", formula, len(group.results)])
+        checks.append({
+            'sheet': 'Summary',
+            'cell': f'B{row}',
+            'formula': formula,
+            'expected': AGGREGATES[aggregate](group.results),
+            'type': t
+        })
+    total_row = len(checks) + 2
+    summary.append(['Total rows', f'=SUM(C2:C{total_row - 1})', None])
+    checks.append({'sheet': 'Summary', 'cell': f'B{total_row}', 'formula': f'=SUM(C2:C{total_row - 1})',
+                   'expected': rows, 'type': 'rows'})
+
+    workbook.save(path)
+
+    answers = {
+        'workbook': os.path.basename(path),
+        'seed': seed,
+        'rows': rows,
+        'tolerance': TOLERANCE,
+        'sheets': ['Summary'] + [title for g in groups.values() for title, _ in g.sheets],
+        'checks': checks,
+        'samples': [s for g in groups.values() for s in g.samples]
+    }
+    with open(answers_path(path), 'w', encoding='utf-8') as f:
+        json.dump(answers, f, indent=2, ensure_ascii=False)
+    return path, rows, len(answers['sheets']), time.perf_counter() - start
+
+def answers_path(path):
+    return str(Path(path).with_suffix('.answers.json'))
+
+def workbook_jobs(count, rows, seed, rows_per_sheet, samples, output_dir):
+    """One job per workbook; workbook i uses seed + i so runs are reproducible for any worker count"""
+    return [(os.path.join(output_dir, f'workbook-{i:04d}.xlsx'), rows, seed + i, rows_per_sheet, samples)
+            for i in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic .xlsx workbooks with expected answers')
+    parser.add_argument('--workbooks', type=int, default=4, help='number of workbooks')
+    parser.add_argument('--rows', type=int, default=10000, help='data rows per workbook (spread over the example types)')
+    parser.add_argument('--rows-per-sheet', type=int, default=100000, help='start a new sheet after this many rows')
+    parser.add_argument('--samples', type=int, default=20, help='row-level checks per example type in the sidecar')
+    parser.add_argument('--seed', type=int, default=42, help='random seed')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes')
+    parser.add_argument('--output-dir', default='training-data/excel/workbooks')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Synthetic Excel Workbook Generator")
+    print("=" * 60)
+    print()
+
+    print(f"Writing {args.workbooks} workbook(s) x {args.rows:,} rows (seed {args.seed})...")
+    Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+    jobs = workbook_jobs(args.workbooks, args.rows, args.seed, args.rows_per_sheet, args.samples, args.output_dir)
+
+    start = time.perf_counter()
+    if len(jobs) > 1 and args.workers != 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            results = list(pool.map(write_workbook, jobs))
+    else:
+        results = [write_workbook(job) for job in jobs]
+    elapsed = time.perf_counter() - start
+
+    for path, rows, sheets, seconds in results:
+        metrics.inc('workbook_rows_total', rows)
+        metrics.inc('workbook_bytes_total', os.path.getsize(path))
+        metrics.observe('workbook_seconds', seconds)
+        print(f"  [OK] {path} ({rows:,} rows, {sheets} sheets, {os.path.getsize(path) / 1e6:.1f} MB, {seconds:.1f}s)")
+
+    total_rows = sum(r[1] for r in results)
+    print("\n" + "=" * 60)
+    print("Summary")
+    print("=" * 60)
+    print(f"Workbooks: {len(results)}")
+    print(f"Rows: {total_rows:,}")
+    print(f"Throughput: {total_rows / max(elapsed, 1e-9):,.0f} rows/sec ({elapsed:.2f}s)")
+    print(f"Expected answers: <workbook>.answers.json next to each file")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Training-data pipeline runner
+Models the scripts as stages with declared inputs/outputs, fingerprints
+inputs + code (each script and the local modules it imports) + parameters,
+skips stages that are up to date and runs independent stages in parallel
+"""
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'backend' / 'scripts'))
+from telemetry import registry
+
+metrics = registry()
+
+STATE_FILE = 'training-data/.pipeline-state.json'
+STATE_VERSION = 1
+# Where the stage scripts find local modules: their own directory, then backend/scripts (telemetry)
+IMPORT_PATH = ['scripts', 'backend/scripts']
+
+class Stage:
+    """One pipeline step: a script run with args, reading inputs and producing outputs"""
+    def __init__(self, name, script, args=(), inputs=(), outputs=(), code=(), after=()):
+        self.name = name
+        self.script = script
+        self.args = list(args)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = [script] + local_imports(script) + [c for c in code if c != script]
+        self.after = list(after)
+
+def local_imports(script):
+    """Repository modules `script` imports, directly or through other repository modules
+
+    Walks each module's AST (function-level imports included), so editing a
+    shared module such as corpus_store.py or telemetry.py invalidates every
+    stage that depends on it.
+    """
+    found = []
+    queue = [script]
+    while queue:
+        rel = queue.pop()
+        path = ROOT / rel
+        if not path.is_file():
+            continue
+        for node in ast.walk(ast.parse(path.read_text(encoding='utf-8'), rel)):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                for base in [os.path.dirname(rel)] + IMPORT_PATH:
+                    candidate = f"{base}/{name.replace('.', '/')}.py"
+                    if (ROOT / candidate).is_file():
+                        if candidate != script and candidate not in found:
+                            found.append(candidate)
+                            queue.append(candidate)
+                        break
+    return sorted(found)
+
+def build_stages(opts):
+    """The collect -> generate -> dedup -> select -> prompt/index graph"""
+    so_jsonl = 'training-data/excel/stackoverflow_examples.jsonl'
+    so_dedup = 'training-data/excel/stackoverflow_dedup.jsonl'
+    synthetic_dir = 'training-data/excel/synthetic'
+    best = 'training-data/excel/best_examples.json'
+    return [
+        Stage('collect', 'scripts/collect_stackoverflow_excel.py',
+              args=['--limit', str(opts.limit)] + (['--api-url', opts.api_url] if opts.api_url else []),
+              outputs=[so_jsonl, 'training-data/excel/stackoverflow_examples.json']),
+        Stage('generate', 'scripts/generate_excel_examples.py',
+              args=['--count', str(opts.count), '--seed', str(opts.seed)],
+              outputs=[synthetic_dir, 'training-data/excel/synthetic_examples.json']),
+        Stage('dedup', 'scripts/dedup_examples.py',
+              args=[so_jsonl, '--output', so_dedup],
+              inputs=[so_jsonl], outputs=[so_dedup], after=['collect']),
+        Stage('select', 'scripts/select_best_examples.py',
+              args=['--stackoverflow', so_dedup, '--synthetic', synthetic_dir],
+              inputs=[so_dedup, synthetic_dir], outputs=[best], after=['dedup', 'generate']),
+        Stage('prompt', 'scripts/generate_enhanced_prompt.py',
+              args=['--budget', str(opts.budget), '--tokenizer', opts.tokenizer],
+              inputs=[best], outputs=['training-data/enhanced_system_prompt.txt', 'training-data/prompts'],
+              after=['select']),
+        Stage('index', 'scripts/example_index.py',
+              inputs=[best], outputs=['training-data/excel/example_index.json'], after=['select']),
+    ]
+
+class Hasher:
+    """sha256 of files/directories, reusing digests for files whose size and mtime are unchanged"""
+    def __init__(self, known):
+        self.known = known
+
+    def file(self, path):
+        st = path.stat()
+        key = str(path.relative_to(ROOT))
+        entry = self.known.get(key)
+        if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+            return entry[2]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        self.known[key] = [st.st_size, st.st_mtime_ns, digest.hexdigest()]
+        return digest.hexdigest()
+
+    def path(self, rel):
+        """Digest of a file or a directory tree; None if missing"""
+        path = ROOT / rel
+        if path.is_file():
+            return self.file(path)
+        if path.is_dir():
+            digest = hashlib.sha256()
+            for child in sorted(p for p in path.rglob('*') if p.is_file()):
+                digest.update(str(child.relative_to(path)).encode('utf-8') + b'\0' + self.file(child).encode('ascii'))
+            return digest.hexdigest()
+        return None
+
+def fingerprint(stage, hasher):
+    """Combined digest of the stage's code, parameters and input contents"""
+    parts = {
+        'code': {c: hasher.path(c) for c in stage.code},
+        'args': stage.args,
+        'inputs': {i: hasher.path(i) for i in stage.inputs},
+        'python': sys.version_info[:2]
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+def outputs_digest(stage, hasher):
+    return {o: hasher.path(o) for o in stage.outputs}
+
+def load_state():
+    try:
+        with open(ROOT / STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') == STATE_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {'version': STATE_VERSION, 'stages': {}, 'files': {}}
+
+def save_state(state):
+    path = ROOT / STATE_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+def run_stage(stage, log_dir):
+    """Run the stage's script from the repository root; returns (returncode, seconds)"""
+    start = time.perf_counter()
+    log_path = log_dir / f'{stage.name}.log'
+    with open(log_path, 'w', encoding='utf-8') as log:
+        code = subprocess.call([sys.executable, stage.script] + stage.args, cwd=ROOT,
+                               stdout=log, stderr=subprocess.STDOUT)
+    return code, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the training-data pipeline, skipping up-to-date stages')
+    parser.add_argument('--only', nargs='+', metavar='STAGE', help='run only these stages (and nothing downstream)')
+    parser.add_argument('--force', nargs='+', default=[], metavar='STAGE', help="rerun these stages even if up to date ('all' for every stage; use 'collect' to refresh API data)")
+    parser.add_argument('--jobs', type=int, default=2, help='stages to run in parallel')
+    parser.add_argument('--dry-run', action='store_true', help='show what would run')
+    parser.add_argument('--limit', type=int, default=50, help='collect: questions to fetch')
+    parser.add_argument('--api-url', help='collect: StackExchange API base URL (e.g. a local stub)')
+    parser.add_argument('--count', type=int, default=30, help='generate: synthetic examples')
+    parser.add_argument('--seed', type=int, default=42, help='generate: random seed')
+    parser.add_argument('--budget', type=int, default=1200, help='prompt: token budget')
+    parser.add_argument('--tokenizer', choices=('tiktoken', 'estimate'), default='tiktoken', help='prompt: token counter')
+    args = parser.parse_args()
+
+    stages = {s.name: s for s in build_stages(args)}
+    selected = set(args.only or stages)
+    unknown = (selected | set(args.force)) - set(stages) - {'all'}
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+
+    state = load_state()
+    hasher = Hasher(state['files'])
+    log_dir = ROOT / 'training-data' / '.logs'
+    log_dir.mkdir(parents=True, exist_ok=True)
+
+    print("=" * 60)
+    print("Training-Data Pipeline")
+    print("=" * 60)
+
+    results = {}
+    done = set()
+    pending = [name for name in stages if name in selected]
+    running = {}
+
+    def ready(name):
+        return all(dep in done or dep not in selected for dep in stages[name].after)
+
+    with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+        while pending or running:
+            for name in [n for n in pending if ready(n)]:
+                pending.remove(name)
+                stage = stages[name]
+                fp = fingerprint(stage, hasher)
+                previous = state['stages'].get(name, {})
+                forced = name in args.force or 'all' in args.force
+                # In a dry run nothing upstream has actually run: a stage after a planned one is planned too
+                upstream = [dep for dep in stage.after if results.get(dep, ('',))[0] == 'would run']
+                up_to_date = (previous.get('fingerprint') == fp
+                              and previous.get('outputs') == outputs_digest(stage, hasher)
+                              and all(previous['outputs'].values()))
+                if up_to_date and not forced and not upstream:
+                    results[name] = ('skipped', 0.0)
+                    done.add(name)
+                    print(f"  [SKIP] {name:<9} up to date")
+                elif args.dry_run:
+                    results[name] = ('would run', 0.0)
+                    done.add(name)
+                    reason = 'forced' if forced else f"after {', '.join(upstream)}" if upstream else 'inputs, code or params changed'
+                    print(f"  [PLAN] {name:<9} {reason}")
+                else:
+                    print(f"  [RUN]  {name:<9} {stage.script} {' '.join(stage.args)}")
+                    running[pool.submit(run_stage, stage, log_dir)] = (name, fp)
+
+            if not running:
+                if pending and not any(ready(n) for n in pending):
+                    break
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, fp = running.pop(future)
+                code, seconds = future.result()
+                if code == 0:
+                    state['stages'][name] = {'fingerprint': fp, 'outputs': outputs_digest(stages[name], hasher), 'seconds': round(seconds, 3)}
+                    save_state(state)
+                    done.add(name)
+                    results[name] = ('ok', seconds)
+                    print(f"  [OK]   {name:<9} {seconds:.2f}s")
+                else:
+                    results[name] = (f'failed ({code})', seconds)
+                    print(f"  [FAIL] {name:<9} exit {code}, see {log_dir / (name + '.log')}")
+                    blocked = {n for n in pending if name in stages[n].after}
+                    while blocked:
+                        for n in blocked:
+                            pending.remove(n)
+                            results[n] = ('blocked', 0.0)
+                        blocked = {n for n in pending if any(dep in results and results[dep][0] == 'blocked' for dep in stages[n].after)}
+
+    save_state(state)
+    for name, (status, seconds) in results.items():
+        metrics.inc('pipeline_stages_total', stage=name, status=status.split(' (')[0].replace(' ', '_'))
+        if status == 'ok':
+            metrics.observe('pipeline_stage_seconds', seconds, stage=name)
+
+    print("\n" + "=" * 60)
+    print("Stage timings")
+    print("=" * 60)
+    for name in stages:
+        if name in results:
+            status, seconds = results[name]
+            print(f"  {name:<9} {status:<12} {seconds:8.2f}s")
+    total = sum(seconds for _, seconds in results.values())
+    print(f"  {'-'*32}")
+    print(f"  {'total':<9} {'':<12} {total:8.2f}s (stage time, parallel stages overlap)")
+
+    if any(status.startswith(('failed', 'blocked')) for status, _ in results.values()):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
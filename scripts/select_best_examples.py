@@ -2,29 +2,132 @@
 """
 Select best examples for system prompts
 """
+import argparse
+import heapq
 import json
+import math
+import re
+import zlib
 from pathlib import Path
+from corpus_store import CorpusStore
+from dedup_examples import dedup, iter_records
 
-def load_examples(file_path):
-    """Load examples from JSON file"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+FORMULA_FUNCTION = re.compile(r'\b([A-Z][A-Z0-9.]{1,})\(')
+MAX_STRATA = 20  # default pool: this many full strata, however many distinct tags the corpus has
 
-def select_stackoverflow_examples(examples, limit=10):
-    """Select top StackOverflow examples by votes"""
-    sorted_examples = sorted(examples, key=lambda x: x.get('votes', 0), reverse=True)
-    return sorted_examples[:limit]
+def iter_examples(paths):
+    """Stream examples from JSONL/JSON files or directories of JSONL shards"""
+    for path in paths:
+        path = Path(path)
+        files = sorted(path.glob('*.jsonl')) if path.is_dir() else [path]
+        for file in files:
+            yield from iter_records(file)
 
-def select_synthetic_examples(examples, limit=10):
-    """Select diverse synthetic examples"""
-    # Get one of each type
-    by_type = {}
-    for e in examples:
-        t = e['type']
-        if t not in by_type:
-            by_type[t] = e
+def features(example):
+    """Cheap local features used for diversity: type, operation, tags and formula functions"""
+    found = set()
+    if example.get('type'):
+        found.add(f"type:{example['type']}")
+    if example.get('operation'):
+        found.add(f"op:{example['operation']}")
+    for tag in example.get('tags', []):
+        if tag != 'excel':
+            found.add(f"tag:{tag}")
+    text = ' '.join(str(example.get(k, '')) for k in ('formula', 'question', 'answer'))
+    found.update(f"fn:{name}" for name in FORMULA_FUNCTION.findall(text))
+    return found
+
+def group_key(example):
+    """Stratum for the per-stratum quotas of the candidate pool"""
+    if 'type' in example:
+        return (example['type'], example.get('operation'))
+    tags = [t for t in example.get('tags', []) if t != 'excel']
+    return tags[0] if tags else 'excel'
+
+def score(example):
+    """Log votes for StackOverflow; synthetic examples carry no quality signal, so selection is pure diversity"""
+    if 'votes' in example:
+        return math.log1p(max(example['votes'], 0))
+    return 0.0
+
+def tiebreak(example):
+    """Stable pseudo-random tie-breaker so equal scores don't all come from the start of the file"""
+    return zlib.crc32(str(example.get('id', '')).encode('utf-8'))
+
+def candidate_pool(examples, per_group, pool_size=None):
+    """Top examples with at most `per_group` per stratum and `pool_size` in total
+
+    Memory is bounded by `pool_size` whatever the corpus size or number of
+    distinct tags: a full stratum admits an example only in place of its own
+    weakest one, a full pool only in place of the weakest example overall.
+    """
+    pool_size = pool_size or per_group * MAX_STRATA
+    groups = {}        # stratum -> min-heap of its pooled items
+    weakest = []       # min-heap over the whole pool; entries replaced within their stratum are skipped lazily
+    replaced = set()
+    size = 0
+    for seq, example in enumerate(examples):
+        key = group_key(example)
+        item = (score(example), tiebreak(example), seq, key, example)
+        heap = groups.get(key)
+        if heap is not None and len(heap) >= per_group:
+            if item[:2] <= heap[0][:2]:
+                continue
+            replaced.add(heapq.heapreplace(heap, item)[2])
+        elif size < pool_size:
+            heapq.heappush(groups.setdefault(key, []), item)
+            size += 1
+        else:
+            while weakest[0][2] in replaced:
+                replaced.discard(heapq.heappop(weakest)[2])
+            if item[:2] <= weakest[0][:2]:
+                continue
+            # The weakest item overall is also the weakest of its stratum
+            dropped = heapq.heappop(weakest)
+            heapq.heappop(groups[dropped[3]])
+            if not groups[dropped[3]]:
+                del groups[dropped[3]]
+            heapq.heappush(groups.setdefault(key, []), item)
+        heapq.heappush(weakest, item)
+        if len(weakest) > 2 * pool_size:
+            weakest = [i for heap in groups.values() for i in heap]
+            heapq.heapify(weakest)
+            replaced.clear()
+    return [item[4] for heap in groups.values() for item in heap]
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+def mmr_select(pool, limit, diversity=0.3):
+    """Maximal marginal relevance: trade score against similarity to what is already selected"""
+    if not pool:
+        return []
+    scores = [score(e) for e in pool]
+    low, high = min(scores), max(scores)
+    relevance = [(s - low) / (high - low) if high > low else 1.0 for s in scores]
+    feats = [features(e) for e in pool]
+    max_sim = [0.0] * len(pool)
+    selected = []
+    remaining = set(range(len(pool)))
 
-    return list(by_type.values())[:limit]
+    while remaining and len(selected) < limit:
+        best = max(remaining, key=lambda i: ((1 - diversity) * relevance[i] - diversity * max_sim[i], tiebreak(pool[i])))
+        selected.append(best)
+        remaining.discard(best)
+        for i in remaining:
+            max_sim[i] = max(max_sim[i], jaccard(feats[i], feats[best]))
+
+    return [pool[i] for i in selected]
+
+def select_stackoverflow_examples(examples, limit=10, diversity=0.3, per_group=None):
+    """Select top StackOverflow examples by votes, one per near-duplicate cluster, diversified by MMR"""
+    pool = candidate_pool(examples, per_group or limit * 5)
+    return mmr_select(dedup(pool), limit, diversity)
+
+def select_synthetic_examples(examples, limit=10, diversity=0.3, per_group=None):
+    """Select diverse synthetic examples"""
+    pool = candidate_pool(examples, per_group or limit)
+    return mmr_select(pool, limit, diversity)
 
 def format_for_prompt(example, source='stackoverflow'):
     """Format example for system prompt"""
@@ -37,27 +140,54 @@ def format_for_prompt(example, source='stackoverflow'):
         }
     else:  # synthetic
         return {
+            'type': example.get('type'),
+            'operation': example.get('operation', example.get('formula')),
             'question': example['question'],
             'data': example.get('data', {}),
             'answer': example['answer'],
             'reasoning': example.get('reasoning', [])
         }
 
+def default_input(*candidates):
+    """First existing path among the candidates"""
+    for candidate in candidates:
+        if Path(candidate).exists():
+            return [candidate]
+    return [candidates[-1]]
+
 def main():
+    parser = argparse.ArgumentParser(description='Select best examples for system prompts')
+    parser.add_argument('--stackoverflow', nargs='+', help='JSONL/JSON files or shard directories')
+    parser.add_argument('--synthetic', nargs='+', help='JSONL/JSON files or shard directories')
+    parser.add_argument('--limit', type=int, default=10, help='examples to select per source')
+    parser.add_argument('--diversity', type=float, default=0.3, help='MMR weight on diversity (0 = pure score)')
+    parser.add_argument('--output', default='training-data/excel/best_examples.json')
+    parser.add_argument('--db', help='read examples from (and save the selection to) this corpus store instead of files')
+    args = parser.parse_args()
+
     print("=" * 60)
     print("Best Example Selector")
     print("=" * 60)
     print()
 
-    # Load examples
-    print("Loading examples...")
-    stackoverflow = load_examples('training-data/excel/stackoverflow_examples.json')
-    synthetic = load_examples('training-data/excel/synthetic_examples.json')
+    stackoverflow = args.stackoverflow or default_input('training-data/excel/stackoverflow_dedup.jsonl',
+                                                        'training-data/excel/stackoverflow_examples.jsonl',
+                                                        'training-data/excel/stackoverflow_examples.json')
+    synthetic = args.synthetic or default_input('training-data/excel/synthetic',
+                                                'training-data/excel/synthetic_examples.json')
 
-    # Select best
+    store = CorpusStore(args.db) if args.db else None
+    if store:
+        stackoverflow_examples = store.query(source='stackoverflow', order=None)
+        synthetic_examples = store.query(source='synthetic', order=None)
+    else:
+        stackoverflow_examples = iter_examples(stackoverflow)
+        synthetic_examples = iter_examples(synthetic)
+
+    # Select best (inputs are streamed, only a bounded candidate pool is kept)
     print("Selecting best examples...")
-    best_stackoverflow = select_stackoverflow_examples(stackoverflow, 10)
-    best_synthetic = select_synthetic_examples(synthetic, 10)
+    best_stackoverflow = select_stackoverflow_examples(stackoverflow_examples, args.limit, args.diversity)
+    best_synthetic = select_synthetic_examples(synthetic_examples, args.limit, args.diversity)
 
     # Format for prompts
     formatted = {
@@ -66,12 +196,17 @@ def main():
     }
 
     # Save
-    output_file = 'training-data/excel/best_examples.json'
+    output_file = args.output
     with open(output_file, 'w', encoding='utf-8') as f:
         json.dump(formatted, f, indent=2, ensure_ascii=False)
 
     print(f"[OK] Saved {len(formatted['stackoverflow']) + len(formatted['synthetic'])} best examples to {output_file}")
 
+    if store:
+        store.put_document('best_examples', formatted)
+        store.close()
+        print(f"[OK] Saved selection to {args.db}")
+
     print("\n" + "=" * 60)
     print("Summary")
     print("=" * 60)
@@ -0,0 +1,162 @@
+"""
+Tests for the StackOverflow collector against a local stub of the StackExchange API
+Run with: python -m pytest scripts/tests
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from collect_stackoverflow_excel import QuotaExhausted, StackExchangeClient, TokenBucket, collect
+
+PAGES = 5
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """/questions pages of `pagesize` questions, /questions/{ids}/answers with 2 answers per question"""
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        page, pagesize = int(query.get('page', 1)), int(query.get('pagesize', 30))
+        with server.lock:
+            server.hits.append((url.path, page, time.monotonic()))
+            count = len(server.hits)
+
+        if url.path == '/questions' and page in server.fail_once:
+            server.fail_once.discard(page)
+            return self.reply(503, {'error_id': 503, 'error_name': 'temporarily_unavailable'})
+
+        if url.path == '/questions':
+            items = [{'question_id': page * 1000 + i, 'title': f'Q{page}-{i}', 'score': 100 - i,
+                      'tags': ['excel'], 'body': f'<p>How do I sum column {i}?</p>'} for i in range(pagesize)]
+            data = {'items': items, 'has_more': page < PAGES}
+        else:
+            ids = [int(i) for i in url.path.split('/')[2].split(';')]
+            answers = [{'question_id': q, 'score': s, 'body': f'<p>Use <code>=SUM(A1:A{s + 1})</code></p>'}
+                       for q in ids for s in range(2)]
+            data = {'items': answers[(page - 1) * pagesize:page * pagesize], 'has_more': page * pagesize < len(answers)}
+
+        data['quota_remaining'] = max(server.quota - count, 0)
+        if count in server.backoff_at:
+            data['backoff'] = server.backoff_at[count]
+        self.reply(200, data)
+
+    def reply(self, status, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.lock = threading.Lock()
+    server.hits = []
+    server.fail_once = set()
+    server.backoff_at = {}
+    server.quota = 10000
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f'http://127.0.0.1:{server.server_address[1]}'
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def client_for(stub, rate=1000):
+    return StackExchangeClient(stub.url, rate=rate)
+
+
+def run(stub, tmp_path, limit, pagesize=10, workers=2):
+    output = str(tmp_path / 'examples.jsonl')
+    written, total = collect(client_for(stub), output, output + '.checkpoint', limit, pagesize, workers)
+    with open(output, 'r', encoding='utf-8') as f:
+        ids = [json.loads(line)['id'] for line in f]
+    return written, total, ids
+
+
+def test_one_batched_answers_call_per_questions_page(stub, tmp_path):
+    written, total, ids = run(stub, tmp_path, limit=30)
+
+    questions = [h for h in stub.hits if h[0] == '/questions']
+    answers = [h for h in stub.hits if h[0].endswith('/answers')]
+    assert len(questions) == 3
+    assert len(answers) == 3
+    assert all(len(h[0].split('/')[2].split(';')) == 10 for h in answers)
+    assert written == total == len(ids) == len(set(ids)) == 30
+
+
+def test_token_bucket_limits_request_rate():
+    bucket = TokenBucket(rate=20, burst=1)
+    start = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    # First token is free, the next five wait 1/20 s each
+    assert time.monotonic() - start >= 0.2
+
+
+def test_client_obeys_backoff(stub):
+    stub.backoff_at = {1: 0.5}
+    client = client_for(stub)
+
+    client.fetch_questions_page(1, 10)
+    client.fetch_questions_page(2, 10)
+
+    first, second = stub.hits[0][2], stub.hits[1][2]
+    assert second - first >= 0.45
+
+
+def test_collect_stops_when_quota_is_exhausted(stub, tmp_path):
+    stub.quota = 3
+    written, total, ids = run(stub, tmp_path, limit=50, workers=1)
+
+    # Request 3 reports quota_remaining == 0: pages still queued in the window are not sent
+    assert len(stub.hits) == 3
+    assert total == len(ids) == len(set(ids)) == 10
+    with open(tmp_path / 'examples.jsonl.checkpoint', 'r', encoding='utf-8') as f:
+        assert json.load(f)['completed_pages'] == [1]
+
+
+def test_client_refuses_requests_after_quota_hits_zero(stub):
+    stub.quota = 1
+    client = client_for(stub)
+
+    with pytest.raises(QuotaExhausted):
+        client.fetch_questions_page(1, 10)
+    with pytest.raises(QuotaExhausted):
+        client.fetch_questions_page(2, 10)
+
+    assert len(stub.hits) == 1
+
+
+def test_failed_page_stays_pending_and_rerun_resumes(stub, tmp_path):
+    stub.fail_once = {2}
+
+    _, total, ids = run(stub, tmp_path, limit=30)
+    with open(tmp_path / 'examples.jsonl.checkpoint', 'r', encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    assert total == 20
+    assert checkpoint['completed_pages'] == [1, 3]
+    assert checkpoint['last_page'] is None
+
+    hits_before = len(stub.hits)
+    written, total, ids = run(stub, tmp_path, limit=30)
+    rerun_pages = [h[1] for h in stub.hits[hits_before:] if h[0] == '/questions']
+    assert rerun_pages == [2]
+    assert written == 10
+    assert total == len(ids) == len(set(ids)) == 30
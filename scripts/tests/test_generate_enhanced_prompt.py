@@ -0,0 +1,51 @@
+"""
+Tests for the budgeted prompt artifacts (generate_enhanced_prompt.py)
+Run with: python -m pytest scripts/tests
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS)
+
+import generate_enhanced_prompt
+from generate_enhanced_prompt import TokenizerUnavailable, use_tokenizer
+
+
+def example(i):
+    return {'question': f'How do I total column {i}?', 'answer': f'Use =SUM(A1:A{i}) below the data',
+            'formula': f'=SUM(A1:A{i})', 'type': 'formula'}
+
+
+def generate(cwd, artifacts_dir, budget=900):
+    subprocess.run([sys.executable, os.path.join(SCRIPTS, 'generate_enhanced_prompt.py'), '--budget', str(budget),
+                    '--tokenizer', 'estimate', '--artifacts-dir', artifacts_dir],
+                   cwd=cwd, check=True, capture_output=True)
+    return {name: (cwd / artifacts_dir / name).read_bytes() for name in sorted(os.listdir(cwd / artifacts_dir))}
+
+
+def test_artifacts_are_stable_across_runs(tmp_path):
+    (tmp_path / 'training-data' / 'excel').mkdir(parents=True)
+    examples = {'synthetic': [example(i) for i in range(2, 12)], 'stackoverflow': [example(i) for i in range(20, 30)]}
+    (tmp_path / 'training-data' / 'excel' / 'best_examples.json').write_text(json.dumps(examples))
+
+    first = generate(tmp_path, 'first')
+    second = generate(tmp_path, 'second')
+
+    assert first == second
+    assert json.loads(first['manifest.json'])['tokenizer'] == 'estimate'
+
+
+def test_missing_tiktoken_fails_instead_of_estimating(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'tiktoken', None)
+    monkeypatch.setattr(generate_enhanced_prompt, '_tokenizer', None)
+
+    with pytest.raises(TokenizerUnavailable):
+        use_tokenizer('tiktoken')
+    with pytest.raises(TokenizerUnavailable):
+        generate_enhanced_prompt.count_tokens('=SUM(A1:A3)')
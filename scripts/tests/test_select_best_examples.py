@@ -0,0 +1,58 @@
+"""
+Tests for the bounded candidate pool (select_best_examples.py) and JSON array streaming (dedup_examples.py)
+Run with: python -m pytest scripts/tests
+"""
+
+import io
+import json
+import os
+import random
+import sys
+
+SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SCRIPTS)
+
+from dedup_examples import iter_json_array
+from select_best_examples import candidate_pool, group_key, score, tiebreak
+
+
+def so_example(i, votes, tag):
+    return {'id': i, 'votes': votes, 'tags': ['excel', tag], 'title': f'Q{i}', 'question': f'q{i}', 'answer': f'a{i}'}
+
+
+def reference_pool(examples, per_group, pool_size):
+    """Best-first, skipping examples whose stratum is full, until the pool is full"""
+    order = sorted(enumerate(examples), key=lambda p: (score(p[1]), tiebreak(p[1]), p[0]), reverse=True)
+    taken, counts = [], {}
+    for _, example in order:
+        key = group_key(example)
+        if counts.get(key, 0) < per_group and len(taken) < pool_size:
+            counts[key] = counts.get(key, 0) + 1
+            taken.append(example['id'])
+    return sorted(taken)
+
+
+def test_pool_is_bounded_by_total_size_with_many_distinct_tags():
+    examples = [so_example(i, votes=i, tag=f'tag{i}') for i in range(5000)]
+
+    pool = candidate_pool(examples, per_group=5, pool_size=40)
+
+    assert sorted(e['id'] for e in pool) == list(range(4960, 5000))
+
+
+def test_pool_matches_best_first_selection_with_quotas():
+    rng = random.Random(7)
+    examples = [so_example(i, votes=rng.randint(0, 50), tag=f'tag{rng.randint(0, 30)}') for i in range(3000)]
+
+    pool = candidate_pool(examples, per_group=4, pool_size=60)
+
+    assert sorted(e['id'] for e in pool) == reference_pool(examples, per_group=4, pool_size=60)
+
+
+def test_iter_json_array_streams_across_chunk_boundaries():
+    records = [{'id': i, 'text': 'x' * (i % 13), 'nested': [i, {'s': '], {'}]} for i in range(50)]
+    text = ' \n[\n ' + ',\n  '.join(json.dumps(r) for r in records) + ' \n]\n'
+
+    assert list(iter_json_array(io.StringIO(text), chunk_size=7)) == records
+    assert list(iter_json_array(io.StringIO('[]'), chunk_size=1)) == []
+    assert list(iter_json_array(io.StringIO('[1, 23, 456]'), chunk_size=2)) == [1, 23, 456]